@@ -83,9 +83,28 @@ class AppConfig:
     map_path_color = "#60a5fa"
     map_path_width = 2
 
+    # 궤적 점 수 줄이기 (MapPage scene px 기준, 1 m = 100 px)
+    map_trace_min_step_px = 3.0    # 직전 점과 이보다 가까운 pose 는 저장 안 함 (정지/흔들림)
+    map_trace_simplify_px = 1.0    # load_events bulk 저장 시 Douglas-Peucker 오차
+    map_trace_max_points = 20000   # 저장 점 상한, 넘으면 DP 로 압축 (3/4 까지)
+    map_trace_lod_px = 1.5         # 줌 아웃 시 화면 px 기준 생략 오차 (0 = LOD 끔)
+
+    # 로봇 아이콘 애니메이션 (불규칙한 pose 사이를 고정 주기로 보간, utils/pose_interp.py)
+    map_anim_enabled = True
+    map_anim_fps = 30              # 표시 주기 (움직일 게 없으면 타이머 정지)
+    map_anim_delay_s = 1.0         # 표시 지연 = 보간 버퍼 (fs_events_pose_emit_interval_s 정도)
+    map_anim_max_extrap_s = 0.5    # 다음 pose 가 늦을 때 마지막 속도로 외삽하는 최대 시간
+    map_anim_max_gap_s = 5.0       # 이보다 긴 간격은 보간하지 않고 바로 이동
+    map_anim_coalesce_s = 0.05     # 이 안에 몰려 온 pose 는 1개로 합침
+
     # 로봇 표시 + 파동 효과
     map_robot_color = "#e7eaf0"
     map_pulse_color = "#60a5fa"
+    map_ripple_pool = 3            # 재사용하는 파동 item 수
+    map_ripple_period_ms = 1500    # 새 파동 주기
+    map_ripple_duration_ms = 1800  # 파동 1개가 퍼지는 시간
+    map_ripple_max_px = 250        # 파동 최대 지름
+    map_ripple_fps = 30            # 공유 애니메이션 타이머 주기
     # 1. 맵 월드 크기를 좌표 최대값(100)보다 크게 설정
     map_world_w_m = 110.0  # 10.0 -> 110.0으로 수정
     map_world_h_m = 110.0  # 10.0 -> 110.0으로 수정
@@ -110,27 +129,110 @@ class AppConfig:
     # =====================
     camera_enabled: bool = True
     # camera_url: str = "http://10.41.145.39:5000/video_csi"
-    cam_source = "gstreamer"
+    cam_source = "gstreamer"  # "gstreamer"(Jetson UDP) | "v4l2"(USB camera_index) | "file"
     cam_port = 5000           # 사용할 포트 번호
-    camera_width: int = 640
+    camera_width: int = 640   # GStreamer 에서 이 해상도로 scale (0 이면 원본)
     camera_height: int = 480
+    camera_index: int = 0     # v4l2 소스 (/dev/videoN)
+
+    # GStreamer 파이프라인 (utils/frame_source.py)
+    cam_decoder: str = "auto"         # "auto" | "v4l2h264dec"(RPi HW) | "avdec_h264"
+    cam_jitter_latency_ms: int = 0    # >0 이면 rtpjitterbuffer 사용 (지연 증가, 끊김 감소)
+    cam_fallback: tuple = ("v4l2", "file")   # cam_source 실패 시 시도 순서
+    cam_file_path: str = ""           # file 소스 경로 (녹화 영상 또는 이미지 디렉터리)
+    cam_replay_fps: float = 0.0       # file 재생 속도 (0 = 영상 fps, 디렉터리는 30)
+    cam_replay_pace: bool = True      # False 면 최대 속도로 재생
+    cam_replay_loop: bool = True      # 끝나면 처음부터 반복
+
+    # 비전 계측 (utils/vision_metrics.py)
+    vision_metrics_interval_s: float = 1.0   # metricsReady 주기 (0 = 끔)
+    vision_stats_overlay: bool = False       # Control 페이지 카메라 화면에 fps/latency 표시 (FPS 버튼으로 토글)
 
     # =====================
     # YOLOv5 TFLite
     # =====================
     yolo_enabled: bool = True
+    # int8 양자화 모델(models/best-int8.tflite)도 그대로 사용 가능 (입력/출력 양자화 자동 처리)
     yolo_model_path: str = "models/best-fp16.tflite"
     yolo_data_yaml: str = "models/data.yaml"
+
+    # 입력 resize 방식 (utils/yolo_preprocess.py)
+    # - "letterbox": 비율 유지 + 패딩 (YOLOv5 학습과 동일, 320 같은 작은 입력에서도 정확도 유지)
+    # - "stretch"  : 입력 크기로 늘림 (이전 동작)
+    yolo_preprocess_mode: str = "letterbox"
+
+    # 추론 영역 (ROI) - 정규화 좌표 (x, y, w, h), 0~1
+    # 비어 있으면 전체 프레임. 여러 개면 ROI 마다 추론 후 합쳐서 NMS.
+    # 예) 주행 경로(하단 중앙 밴드)만: [(0.2, 0.45, 0.6, 0.55)]
+    yolo_rois: list = field(default_factory=list)
+
+    # TFLite interpreter (utils/tflite_loader.py)
+    # - num_threads: interpreter 스레드 수 (RPi 4코어 -> 4)
+    # - delegate   : "default" | "xnnpack" | "none" | "auto"(autotune 시 default/xnnpack 비교)
+    # - autotune   : 시작 시 (스레드 수 x delegate) 후보를 벤치마크해 가장 빠른 설정 선택
+    yolo_num_threads: int = 4
+    yolo_delegate: str = "auto"
+    yolo_xnnpack_lib: str = ""   # 명시적 XNNPACK .so 경로 (비우면 기본 이름으로 탐색)
+    yolo_autotune: bool = True
+    yolo_autotune_runs: int = 5
+
     yolo_labels: list[str] = None # -> 없으면 cls0, cls1 로 표시
     yolo_colors: dict[int, tuple[int,int,int]] = None
     yolo_conf_thres: float = 0.35
     yolo_nms_iou: float = 0.45
 
+    # 추론 주기 (utils/infer_scheduler.py)
+    # - stride : N 프레임마다 1번 추론 (1 = 매 프레임). 건너뛴 프레임엔 마지막 박스를 그대로 그림
+    # - max_hz : 초당 최대 추론 횟수 (0 = 제한 없음)
+    # - adaptive: 추론 busy 비율(추론 시간 합 / 경과 시간)이 busy_max 를 넘으면 stride 를 늘리고,
+    #             여유가 생기면 다시 줄임 (max_stride ~ 설정 stride 사이)
+    yolo_infer_stride: int = 1
+    yolo_infer_max_hz: float = 0.0
+    yolo_adaptive_stride: bool = False
+    yolo_infer_busy_max: float = 0.5
+    yolo_max_stride: int = 6
+
+    # 트래커 (utils/yolo_tracker.py, SORT + Kalman)
+    # 추론 사이 프레임은 트랙 예측으로 채우므로 stride/max_hz 를 올려도 박스가 영상을 따라감
+    yolo_track: bool = True
+    yolo_track_iou: float = 0.3            # 예측 박스-검출 매칭 최소 IoU
+    yolo_track_centroid_gate: float = 1.0  # IoU 매칭 실패 시 중심 거리 매칭 (박스 대각선 배수, 0 = 끔)
+    yolo_track_min_hits: int = 2           # 이 횟수 이상 매칭된 트랙만 표시 (1 프레임 오검출 제거)
+    yolo_track_max_age_s: float = 1.0      # 이 시간 동안 매칭 없으면 트랙 삭제
+
+    # motion gate (utils/motion_gate.py): 장면 변화가 없으면 추론 생략 + 마지막 검출 재사용
+    yolo_motion_gate: bool = True
+    yolo_motion_pixel_thres: int = 12      # 64x48 gray 썸네일에서 이 밝기 차 이상이면 "변한 픽셀"
+    yolo_motion_area_thres: float = 0.01   # 변한 픽셀 비율이 이 이상이면 추론
+    yolo_motion_hist_thres: float = 0.05   # 히스토그램 Bhattacharyya 거리 (조명 변화)
+    yolo_motion_max_skip_s: float = 5.0    # 변화가 없어도 이 간격으로 1번은 추론
+
+    # HMI 검출 요약 MQTT 발행 (utils/detection_publisher.py) -> /robot/<id>/inference/yolo
+    yolo_mqtt_publish: bool = True
+    yolo_mqtt_max_hz: float = 2.0          # 초당 최대 발행 횟수
+    yolo_mqtt_heartbeat_s: float = 5.0     # 변화가 없어도 이 주기로 1번 발행
+    yolo_mqtt_box_quant_px: int = 16       # nearest 박스가 이 px 이상 움직여야 "변화" 로 봄
+
+    # 출력 형식: "auto" (shape 로 판정) | "raw" | "nmsed" (NMS 포함 export, [x1,y1,x2,y2,score,cls])
+    yolo_output_layout: str = "auto"
+
+    # score 계산 방식 (utils/yolo_decode.py)
+    # "obj_cls": obj * max(cls) (YOLOv5 기본) / "obj": obj 만 사용
+    yolo_score_mode: str = "obj_cls"
+
     # class-agnostic NMS 여부
     # False: per-class NMS (권장)
     # True : class-agnostic NMS (겹치면 클래스 무시하고 제거)
     yolo_nms_agnostic: bool = False
 
+    # NMS 엔진 옵션 (utils/yolo_nms.py)
+    # - topk   : NMS 전에 score 상위 K 개만 남김 (박스 많은 프레임에서 O(N^2) 방지, None=off)
+    # - max_det: NMS 후 최대 검출 수 (None=제한 없음)
+    # - backend: "numpy" | "cv2" (cv2.dnn.NMSBoxes)
+    yolo_nms_topk: int = 300
+    yolo_max_det: int = 100
+    yolo_nms_backend: str = "numpy"
+
     # Overlay toggles (HMI can flip these at runtime)
     yolo_draw_boxes: bool = True
     yolo_draw_labels: bool = True
@@ -16,7 +16,9 @@ from config import CFG
 from page_ui.ui_form import Ui_MainWindow
 from utils.mqtt_client import MqttClient
 from utils.firestore_client import FirestoreConfig, FirestoreWorker
-from utils.camera_worker import CameraWorker
+from utils.camera_service import CameraService
+from utils.detection_publisher import DetectionPublisher
+from utils.yolo_labels import apply_data_yaml
 
 from pages.overview_page import OverviewPage
 from pages.control_page import ControlPage
@@ -32,6 +34,9 @@ class MainWindow(QMainWindow):
 
         self.tz = pytz.timezone("Asia/Seoul")
 
+        # YOLO class 이름/색: config 에 없으면 data.yaml 에서 (페이지/overlay/MQTT 가 모두 cfg 를 읽으므로 먼저)
+        apply_data_yaml(CFG)
+
         # -------------------------
         # UI
         # -------------------------
@@ -139,16 +144,25 @@ class MainWindow(QMainWindow):
             self.fs.start()
 
         # -------------------------
-        # Camera (Jetson Nano Stream + PC YOLO Inference)
+        # Camera (Jetson Nano Stream + HMI YOLO Inference)
         # -------------------------
-        self.cam_worker = None
+        # 캡처 + TFLite interpreter 는 CameraService 하나만 소유하고, 구독자(ControlPage 등)에게 fan-out
+        self.camera = None
+        self.det_publisher = None
         if CFG.camera_enabled:
-            # 통합된 CameraWorker 인스턴스 생성
-            self.cam_worker = CameraWorker(cfg=CFG)
-            # 중요: CameraWorker의 frameReady 시그널을 MainWindow의 슬롯에 연결
-            self.cam_worker.frameReady.connect(self.on_camera_frame)
-            self.cam_worker.status.connect(self.page_logs.append)
-            self.cam_worker.start()
+            self.camera = CameraService(CFG, parent=self)
+            self.camera.status.connect(self.page_logs.append)
+            self.page_control.attach_camera(self.camera)
+            self.page_control.cameraLatency.connect(
+                lambda ms: self.page_logs.append(f"[CAM] capture->display latency {ms:.1f} ms")
+            )
+            self.camera.acquire()
+
+            # HMI 검출 요약 -> MQTT (변화가 있을 때만, 최대 yolo_mqtt_max_hz)
+            if getattr(CFG, "yolo_mqtt_publish", True):
+                self.det_publisher = DetectionPublisher(CFG, self.mqtt, parent=self)
+                self.det_publisher.set_active(self.mqtt_ok)
+                self.camera.detectionsReady.connect(self.det_publisher.on_detections)
 
         # Wire control signals
         self.page_control.interactionCommand.connect(self._handle_control_interaction)
@@ -294,11 +308,16 @@ class MainWindow(QMainWindow):
         self.mqtt.subscribe("cmd/+/request")
         self.mqtt.subscribe("telemetry/#")
 
+        if self.det_publisher is not None:
+            self.det_publisher.set_active(True)
+
         self._update_top_status()
 
     def on_mqtt_disconnected(self):
         self.mqtt_ok = False
         self.page_logs.append("[MQTT] Disconnected")
+        if self.det_publisher is not None:
+            self.det_publisher.set_active(False)
         self._update_top_status()
 
     def on_mqtt_message(self, topic: str, payload: str):
@@ -327,11 +346,6 @@ class MainWindow(QMainWindow):
             self.page_logs.append(f"[REQ-MON] {topic} -> {data}")
             return
 
-        if topic == f"/robot/{CFG.robot_id}/inference/yolo":
-            try:
-                self.current_inference = json.loads(payload) # [{"box": [x,y,w,h], "cls": 0, "conf": 0.8}, ...]
-            except: pass
-
     def _handle_control_interaction(self, input_mode: str, raw_data: any, parsed_data: dict):
         """
         ControlPage의 모든 조작(이동, 그랩, 서보 등)을 처리합니다.
@@ -558,7 +572,11 @@ class MainWindow(QMainWindow):
                 if x is not None and y is not None and theta is not None:
                     try:
                         if hasattr(self.page_map, "update_current_pose"):
-                            self.page_map.update_current_pose(float(x), float(y), float(theta))
+                            # 문서 시각을 같이 넘겨야 events pose 와 같은 시간축으로 보간됨
+                            self.page_map.update_current_pose(
+                                float(x), float(y), float(theta),
+                                ts=cur.get("updated_at") or cur.get("ts"),
+                            )
                         elif hasattr(self.page_map, "push_pose"):
                             self.page_map.push_pose(float(x), float(y), yaw=float(theta), ts=None)
                     except Exception:
@@ -568,10 +586,8 @@ class MainWindow(QMainWindow):
 
     def closeEvent(self, event):
         try:
-            if self.cam is not None:
-                self.cam.stop()
-                self.cam.quit()
-                self.cam.wait()
+            if self.camera is not None:
+                self.camera.shutdown()
         except Exception:
             pass
 
@@ -590,15 +606,6 @@ class MainWindow(QMainWindow):
 
         event.accept()
 
-    def on_camera_frame(self, pixmap):
-            """
-            CameraWorker(PC 직접 추론 버전)가 YOLO 분석을 마친 프레임을 보내주면
-            ControlPage의 카메라 뷰에 출력합니다.
-            """
-            if pixmap and not pixmap.isNull():
-                # 이미 박스가 그려진 QPixmap이 넘어오므로 그대로 표시만 하면 됩니다.
-                self.page_control.set_camera_pixmap(pixmap)
-
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -10,49 +10,96 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
-# 2. 업로드해주신 CameraWorker와 UI 불러오기
-from utils.camera_worker import CameraWorker
+# 2. 설정 / 카메라 뷰 / UI 불러오기
+from config import CFG
+from utils.camera_view import CameraView
 from page_ui.pages.ui_control import Ui_ControlForm
 
 class ControlPage(QWidget):
     # MainWindow로 제어 명령을 전달하기 위한 시그널
     interactionCommand = Signal(str, object, dict)
+    # 카메라 캡처 -> 화면 표시 지연 (ms), MainWindow 에서 로그로 출력
+    cameraLatency = Signal(float)
 
-    def __init__(self, parent=None):
+    def __init__(self, camera=None, parent=None):
         super().__init__(parent)
         self.ui = Ui_ControlForm()
         self.ui.setupUi(self)
         self.is_connected = False
 
-        # 3. YOLO 및 카메라 설정 (cfg 객체 구성)
-        class Config:
-            yolo_model_path = "models/best_fp16.tflite" # 실제 모델 경로 확인
-            yolo_conf_thres = 0.5
-            yolo_iou_thres = 0.45
-            # 젯슨 나노의 IP 주소 (MQTT용)
-            agv_ip = "10.236.94.250"
-            robot_id = "agv1"
-
-        self.cfg = Config()
-
-        # 4. 통합 카메라 & 추론 워커 실행
-        self.worker = CameraWorker(self.cfg)
-        self.worker.frameReady.connect(self.update_camera_view)
-        self.worker.status.connect(lambda msg: print(f"[CAMERA/YOLO] {msg}"))
-        self.worker.start()
+        # 3. 설정은 앱 공용 AppConfig 사용 (카메라/모델은 MainWindow 의 CameraService 하나만 사용)
+        self.cfg = CFG
+
+        # 카메라 영상 + YOLO overlay 위젯 (lbl_camera_view 자리 교체)
+        self.camera_view = CameraView(self.ui.frameCamera)
+        self.camera_view.set_class_style(getattr(self.cfg, "yolo_labels", None), getattr(self.cfg, "yolo_colors", None))
+        self.camera_view.set_overlay(
+            boxes=getattr(self.cfg, "yolo_draw_boxes", True),
+            labels=getattr(self.cfg, "yolo_draw_labels", True),
+        )
+        self.camera_view.latencyReport.connect(self.cameraLatency)
+        self.camera_view.set_stats_overlay(getattr(self.cfg, "vision_stats_overlay", False))
+        self.ui.vl_cam.replaceWidget(self.ui.lbl_camera_view, self.camera_view)
+        self.ui.lbl_camera_view.hide()
+
+        # 4. 카메라 소스 연결 (CameraService / CameraWorker, 없으면 나중에 attach_camera)
+        self.camera = None
+        if camera is not None:
+            self.attach_camera(camera)
 
         self.init_layout_optimization()
         self.bind_events()
 
+    def attach_camera(self, camera):
+        """카메라 소스(CameraService/CameraWorker)의 frame ring / 검출 시그널을 CameraView 에 연결"""
+        if camera is self.camera:
+            return
+        self.detach_camera()
+        self.camera = camera
+        self.camera_view.attach_ring(camera.ring)
+        self.camera_view.metrics = getattr(camera, "metrics", None)
+        camera.frameIndexReady.connect(self.camera_view.on_frame_index)
+        camera.detectionsReady.connect(self.update_detections)
+        if hasattr(camera, "metricsReady"):
+            camera.metricsReady.connect(self.camera_view.set_stats)
+
+    def detach_camera(self):
+        if self.camera is None:
+            return
+        try:
+            self.camera.frameIndexReady.disconnect(self.camera_view.on_frame_index)
+            self.camera.detectionsReady.disconnect(self.update_detections)
+            if hasattr(self.camera, "metricsReady"):
+                self.camera.metricsReady.disconnect(self.camera_view.set_stats)
+        except (RuntimeError, TypeError):
+            pass
+        self.camera = None
+        self.camera_view.metrics = None
+        self.camera_view.attach_ring(None)
+
     @Slot(QPixmap)
     def update_camera_view(self, pixmap):
-        # CameraWorker에서 보낸 (YOLO 박스가 그려진) 영상을 화면에 출력
-        if not pixmap.isNull():
-            self.ui.lbl_camera_view.setPixmap(pixmap.scaled(
-                self.ui.lbl_camera_view.size(),
-                Qt.KeepAspectRatio,
-                Qt.SmoothTransformation
-            ))
+        # 원본 프레임만 전달 (스케일/박스는 CameraView.paintEvent 에서 1번에 처리)
+        self.camera_view.set_frame(pixmap)
+
+    @Slot(object)
+    def update_detections(self, dets):
+        self.camera_view.set_detections(dets)
+
+    # QPixmap 기반 소스(YoloTFLiteWorker 등) 호환용
+    def set_camera_pixmap(self, pixmap):
+        self.update_camera_view(pixmap)
+
+    def set_camera_detections(self, dets):
+        self.update_detections(dets)
+
+    def set_overlay(self, boxes=None, labels=None):
+        """overlay 토글 (프레임 재생성 없이 다시 그리기만 함)"""
+        self.camera_view.set_overlay(boxes=boxes, labels=labels)
+
+    def set_stats_overlay(self, enabled):
+        """fps/latency overlay 토글 (카메라 화면 우상단 FPS 버튼과 동일)"""
+        self.camera_view.set_stats_overlay(enabled)
 
     def init_layout_optimization(self):
         # [이전 요청 반영] 라즈베리 파이 800x480 최적화 레이아웃
@@ -132,6 +179,6 @@ class ControlPage(QWidget):
         self.interactionCommand.emit(action, str(value), parsed_data)
 
     def closeEvent(self, event):
-        self.worker.running = False
-        self.worker.wait()
+        # 카메라 수명은 CameraService(MainWindow) 가 관리 -> 여기서는 연결만 해제
+        self.detach_camera()
         event.accept()
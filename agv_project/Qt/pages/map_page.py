@@ -1,57 +1,24 @@
+import math
 import time
-from PySide6.QtCore import Qt, QRectF, QPointF, QTimer, QPropertyAnimation, QEasingCurve, Property, QObject
-from PySide6.QtGui import QColor, QPen, QBrush, QPainterPath, QPainter, QTransform
-from PySide6.QtWidgets import (
-    QWidget, QGraphicsView, QGraphicsScene, QGraphicsPathItem,
-    QGraphicsEllipseItem
-)
+import numpy as np
+from PySide6.QtCore import Qt, QRectF, QPointF, QTimer
+from PySide6.QtGui import QColor, QPen, QBrush, QPainter, QTransform
+from PySide6.QtWidgets import QWidget, QGraphicsScene, QGraphicsEllipseItem
 from config import CFG
+from utils.map_ripple import RipplePool
+from utils.map_trajectory import ChunkedTrajectory, TraceBuffer, decimate_distance, simplify_dp
+from utils.pose_interp import PoseInterpolator
 
-class RippleItem(QObject, QGraphicsEllipseItem):
-    def __init__(self, parent=None):
-        QObject.__init__(self)
-        # 시작 크기
-        QGraphicsEllipseItem.__init__(self, -5, -5, 10, 10)
-
-        # 선 두께를 3에서 5로 상향하여 더 진하게 보이게 함
-        self.ripple_color = QColor(96, 165, 250) # 밝은 파란색
-        self.setPen(QPen(self.ripple_color, 5))
-        self.setBrush(Qt.NoBrush)
-        self.setZValue(999)
-
-        # 애니메이션 설정
-        self.anim = QPropertyAnimation(self, b"rect_prop")
-        self.anim.setDuration(1800) # 지속 시간을 1.2초에서 1.8초로 늘려 더 천천히 퍼지게 함
-        self.anim.setStartValue(QRectF(-5, -5, 10, 10))
-
-        # ★ 파동의 최대 크기를 140에서 250으로 대폭 상향!
-        self.max_size = 250
-        self.anim.setEndValue(QRectF(-self.max_size/2, -self.max_size/2, self.max_size, self.max_size))
-
-        # 부드럽게 퍼지다가 멈추는 효과
-        self.anim.setEasingCurve(QEasingCurve.OutExpo)
-
-        self.anim.finished.connect(self.self_delete)
-        self.anim.start()
-
-    def get_rect_prop(self):
-        return self.rect()
-
-    def set_rect_prop(self, r):
-        self.setRect(r)
-        # 크기에 비례해서 투명도 조절 (사라지는 지점을 더 뒤로 늦춤)
-        progress = r.width() / self.max_size
-        alpha = max(0, int(255 * (1.0 - progress)))
-
-        # 선 두께도 퍼질수록 살짝 얇아지게 하면 더 자연스러움
-        pen_width = max(1, 5 * (1.0 - progress))
-        self.setPen(QPen(QColor(96, 165, 250, alpha), pen_width))
+def ts_seconds(v):
+    """이벤트 ts (epoch s/ms 숫자, datetime, 숫자 문자열) -> float epoch 초. 모르면 0"""
+    if hasattr(v, "timestamp"):
+        return float(v.timestamp())
+    try:
+        t = float(v)
+    except (TypeError, ValueError):
+        return 0.0
+    return t / 1000.0 if t > 1e11 else t
 
-    rect_prop = Property(QRectF, get_rect_prop, set_rect_prop)
-
-    def self_delete(self):
-        if self.scene():
-            self.scene().removeItem(self)
 
 # --- 2. 메인 맵 페이지 클래스 ---
 class MapPage(QWidget):
@@ -74,11 +41,12 @@ class MapPage(QWidget):
         self.ui.mapView.setScene(self.scene)
         self.ui.mapView.setRenderHint(QPainter.Antialiasing)
 
-        # 궤적 아이템 (Path)
-        self.path_item = QGraphicsPathItem()
-        self.path_item.setPen(QPen(QColor("#60a5fa"), 10, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin))
-        self.path_item.setZValue(99)
-        self.scene.addItem(self.path_item)
+        # 궤적 (chunk 단위 path item, 새 점은 마지막 chunk 에만 추가)
+        self.trajectory = ChunkedTrajectory(
+            self.scene,
+            QPen(QColor("#60a5fa"), 10, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin),
+            z=99,
+        )
 
         # 로봇 아이콘 (현재 위치)
         self.robot_item = QGraphicsEllipseItem(-15, -15, 30, 30)
@@ -87,12 +55,37 @@ class MapPage(QWidget):
         self.robot_item.setZValue(1001)
         self.scene.addItem(self.robot_item)
 
-        self.trace_data = []
-
-        # --- 왕왕이(Ripple) 발생 타이머 (1.5초 주기) ---
-        self.ripple_timer = QTimer(self)
-        self.ripple_timer.timeout.connect(self.create_ripple)
-        self.ripple_timer.start(1500)
+        # 궤적 점 저장 (NumPy 배열, 거리 솎기 + 점 수 상한)
+        self.trace = TraceBuffer(
+            min_step=getattr(CFG, "map_trace_min_step_px", 3.0),
+            max_points=getattr(CFG, "map_trace_max_points", 20000),
+        )
+        self.trace_simplify_px = float(getattr(CFG, "map_trace_simplify_px", 1.0))
+        # 줌 LOD: 화면에서 lod_px 보다 작은 굴곡은 생략해서 그림 (0 = 항상 저장된 점 전부)
+        self.trace_lod_px = float(getattr(CFG, "map_trace_lod_px", 1.5))
+        self._lod_eps = 0.0        # 지금 그려진 polyline 의 DP 오차 (scene px)
+
+        # 로봇 아이콘 애니메이션: pose 샘플 사이를 고정 주기로 보간 (움직일 게 없으면 타이머 정지)
+        self.pose_interp = PoseInterpolator.from_cfg(CFG)
+        self._last_pose_ts = None  # 지금까지 받은 event pose 중 가장 늦은 ts (load_events 가 새 pose 만 골라 넣는 기준)
+        self.anim_enabled = bool(getattr(CFG, "map_anim_enabled", True))
+        self.anim_timer = QTimer(self)
+        self.anim_timer.setTimerType(Qt.PreciseTimer)
+        self.anim_timer.setInterval(max(1, int(1000 / max(1.0, float(getattr(CFG, "map_anim_fps", 30))))))
+        self.anim_timer.timeout.connect(self._anim_tick)
+
+        # --- 왕왕이(Ripple): item 3개 재사용 + 타이머 1개, 페이지가 보일 때만 동작 ---
+        self.ripple = RipplePool(
+            self.scene,
+            self._ripple_anchor,
+            color=getattr(CFG, "map_pulse_color", "#60a5fa"),
+            pool_size=getattr(CFG, "map_ripple_pool", 3),
+            period_ms=getattr(CFG, "map_ripple_period_ms", 1500),
+            duration_ms=getattr(CFG, "map_ripple_duration_ms", 1800),
+            max_px=getattr(CFG, "map_ripple_max_px", 250),
+            fps=getattr(CFG, "map_ripple_fps", 30),
+            parent=self,
+        )
 
         # 버튼 및 슬라이더 이벤트 연결
         self.ui.btn_fit.clicked.connect(self.fit_view)
@@ -102,14 +95,23 @@ class MapPage(QWidget):
         # 0.5초 뒤 초기 화면 맞춤 실행
         QTimer.singleShot(500, self.init_view)
 
-    def create_ripple(self):
-        """로봇의 실시간 위치에 파동 효과를 생성합니다."""
-        if not self.trace_data: return
+    def _ripple_anchor(self):
+        """파동 중심 = 로봇 아이콘 위치 (pose 를 받기 전에는 없음)"""
+        if not len(self.trace) and not len(self.pose_interp):
+            return None
+        return self.robot_item.pos()
 
-        last_pt = self.trace_data[-1]
-        ripple = RippleItem()
-        ripple.setPos(last_pt)
-        self.scene.addItem(ripple)
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.ripple.start()
+        if len(self.pose_interp):
+            self.anim_timer.start()    # 숨어 있던 동안 밀린 pose 로 이어서 (정지하면 알아서 멈춤)
+
+    def hideEvent(self, event):
+        # stackedWidget 에서 다른 페이지로 바뀌면 맵 애니메이션 전부 정지
+        self.ripple.stop()
+        self.anim_timer.stop()
+        super().hideEvent(event)
 
     def meters_to_px(self, x, y):
         """좌표 스케일링 (/10) 적용"""
@@ -117,35 +119,110 @@ class MapPage(QWidget):
         scaled_y = float(y) / 10.0
         return QPointF(scaled_x * self.px_per_m, scaled_y * self.px_per_m)
 
+    def poses_to_px(self, xy):
+        """meters_to_px 의 배열 버전: (N,2) -> (N,2) scene 좌표 (한 번에 변환)"""
+        return np.asarray(xy, dtype=np.float64) * (self.px_per_m / 10.0)
+
     def on_event_added(self, ev):
         """실시간 데이터 수신 및 궤적 그리기"""
         pose = ev.get("pose")
         if not pose: return
 
         pt = self.meters_to_px(pose.get("x", 0), pose.get("y", 0))
-        self.trace_data.append(pt)
-
-        # 궤적 패스 업데이트
-        path = QPainterPath()
-        if self.trace_data:
-            path.moveTo(self.trace_data[0])
-            for p in self.trace_data[1:]:
-                path.lineTo(p)
-        self.path_item.setPath(path)
-
-        # 로봇 아이콘 이동
-        self.robot_item.setPos(pt)
-        self.ui.lbl_poses.setText(f"{len(self.trace_data)} pts")
+        ts = ts_seconds(ev["ts"]) if ev.get("ts") else None
+        if ts is not None:
+            self._last_pose_ts = max(self._last_pose_ts or 0.0, ts)
+
+        # 로봇 아이콘 이동 (보간 애니메이션)
+        self._push_robot_pose(pt, pose.get("theta", pose.get("yaw", 0.0)), ts)
+        self._append_trace(pt)
+
+    def _append_trace(self, pt):
+        compactions = self.trace.compactions
+        if not self.trace.append(pt.x(), pt.y()):
+            return      # 직전 점과 너무 가까움 (정지 중)
+
+        if self.trace.compactions != compactions:
+            # 점 수 상한으로 저장 궤적이 압축됨 -> 전체 다시 그림
+            self._redraw_trace()
+        else:
+            # 궤적 패스 업데이트 (새 구간만 추가, 줌 LOD 보다 짧은 구간은 생략)
+            last = self.trajectory.last_point()
+            if last is None or math.hypot(pt.x() - last.x(), pt.y() - last.y()) >= self._lod_eps:
+                self.trajectory.append(pt)
+        self.ui.lbl_poses.setText(f"{len(self.trace)} pts")
 
         # 첫 데이터 수신 시 자동 Fit
-        if len(self.trace_data) == 1:
+        if len(self.trace) == 1:
             self.fit_view()
 
+    # -------------------------
+    # robot pose animation
+    # -------------------------
+    def _push_robot_pose(self, pt, yaw=0.0, ts=None):
+        """ts = source epoch 초. 없으면 도착 epoch 시각 -> 모든 소스가 같은 시간축(epoch)으로 보간기에 들어감"""
+        if not self.anim_enabled:
+            self.robot_item.setPos(pt)
+            return
+        if ts is None:
+            ts = time.time()
+        # 숨어 있을 때는 샘플만 쌓고 타이머는 showEvent 에서 재개
+        if self.pose_interp.push(pt.x(), pt.y(), yaw, ts=ts) and self.isVisible() and not self.anim_timer.isActive():
+            self.anim_timer.start()
+
+    def _anim_tick(self):
+        pose = self.pose_interp.pose_at()
+        if pose is None:
+            self.anim_timer.stop()
+            return
+        x, y, _yaw, settled = pose
+        self.robot_item.setPos(x, y)
+        if settled:
+            self.anim_timer.stop()
+
+    def append_pose(self, x, y, yaw=0.0, t=None):
+        """MQTT pose (map_use_mqtt_pose): 궤적 + 로봇 아이콘. t = source epoch 초"""
+        pt = self.meters_to_px(x, y)
+        self._push_robot_pose(pt, yaw, t)
+        self._append_trace(pt)
+
+    def push_pose(self, x, y, yaw=0.0, ts=None):
+        self.append_pose(x, y, yaw, t=ts)
+
+    def update_current_pose(self, x, y, theta=0.0, ts=None):
+        """robots snapshot: 궤적에는 안 넣고 로봇 아이콘만. ts = robot 문서 updated_at (없으면 도착 시각)"""
+        self._push_robot_pose(self.meters_to_px(x, y), theta, ts_seconds(ts) if ts else None)
+
+    def _lod_eps_for_view(self):
+        """현재 줌 배율에서 쓸 DP 오차 (scene px). 저장 간격 x 2^k 로 양자화해서 줌이 조금 바뀔 때마다 다시 그리지 않음"""
+        scale = self.ui.mapView.transform().m11()
+        if self.trace_lod_px <= 0 or scale <= 0:
+            return 0.0
+        base = max(self.trace.min_step, 0.5)
+        ratio = self.trace_lod_px / scale / base
+        if ratio < 1.0:
+            return 0.0
+        return base * 2.0 ** math.floor(math.log2(ratio))
+
+    def _update_lod(self):
+        eps = self._lod_eps_for_view()
+        if eps != self._lod_eps:
+            self._lod_eps = eps
+            self._redraw_trace()
+
+    def _redraw_trace(self):
+        """저장된 점 -> (현재 LOD 로 단순화) -> 궤적 path 전체 재생성"""
+        pts = self.trace.points()
+        if self._lod_eps > 0:
+            pts = simplify_dp(decimate_distance(pts, self._lod_eps), self._lod_eps)
+        self.trajectory.set_points(pts)
+
     def update_zoom_from_slider(self, value):
         """슬라이더에 따른 절대 배율 조절"""
         scale_factor = value / 100.0
         self.ui.mapView.setTransform(QTransform().scale(scale_factor, scale_factor))
         self.ui.lbl_zoom_value.setText(f"{value}%")
+        self._update_lod()
 
     def init_view(self):
         """초기 화면을 넓게 잡습니다."""
@@ -155,7 +232,11 @@ class MapPage(QWidget):
 
     def fit_view(self):
         """궤적을 기준으로 화면에 꽉 차게 정렬 (넓은 여백 포함)"""
-        rect = self.path_item.boundingRect()
+        rect = self.trajectory.bounding_rect()
+        if len(self.trace):
+            pts = self.trace.points()
+            (x0, y0), (x1, y1) = pts.min(axis=0), pts.max(axis=0)
+            rect = QRectF(x0, y0, x1 - x0, y1 - y0)
         if rect.width() < 10:
             rect = QRectF(0, 0, 800, 800)
 
@@ -174,15 +255,63 @@ class MapPage(QWidget):
         self.ui.sld_zoom.setValue(zoom_percent)
         self.ui.lbl_zoom_value.setText(f"{zoom_percent}%")
         self.ui.sld_zoom.blockSignals(False)
+        self._update_lod()
 
     def load_events(self, events, robot_id=None):
-        self.clear_all()
-        sorted_ev = sorted(events, key=lambda x: x.get("ts", 0))
-        for ev in sorted_ev:
-            if robot_id and str(ev.get("robot_id")) != str(robot_id): continue
-            self.on_event_added(ev)
+        """전체 이벤트로 궤적을 다시 그린다 (bulk).
+
+        robot 필터 / pose 추출 -> ts 정렬 -> 좌표 변환을 배열로 한 번에 하고,
+        저장은 거리 솎기 + Douglas-Peucker (map_trace_simplify_px) 후 점 수 상한 적용,
+        궤적 path / 로봇 위치 / 라벨은 마지막에 1번만 갱신한다.
+        """
+        rid = str(robot_id) if robot_id else None
+        ts, xy, yaw = [], [], []
+        for ev in events:
+            if rid is not None and str(ev.get("robot_id")) != rid:
+                continue
+            pose = ev.get("pose")
+            if not pose:
+                continue
+            ts.append(ts_seconds(ev.get("ts", 0)))
+            xy.append((pose.get("x", 0) or 0, pose.get("y", 0) or 0))
+            yaw.append(pose.get("theta", pose.get("yaw", 0.0)) or 0.0)
+
+        was_empty = not len(self.trace)
+        if not xy:
+            # pose 가 하나도 없음 (다른 로봇 선택 등) -> 이전 로봇의 보간 샘플도 버림
+            self.clear_all()
+            self.anim_timer.stop()
+            self.pose_interp.reset()
+            self._last_pose_ts = None
+            return
+
+        ts = np.asarray(ts, dtype=np.float64)
+        order = np.argsort(ts, kind="stable")
+        ts = ts[order]
+        yaw = np.asarray(yaw, dtype=np.float64)[order]
+        pts = self.poses_to_px(np.asarray(xy, dtype=np.float64)[order])
+
+        self.trace.set(pts, eps=self.trace_simplify_px)
+
+        if was_empty or not len(self.pose_interp) or self._last_pose_ts is None:
+            # 첫 로드: 보간 없이 마지막 pose 로 바로
+            self.anim_timer.stop()
+            self.pose_interp.snap(pts[-1, 0], pts[-1, 1], yaw[-1])
+            self.robot_item.setPos(QPointF(*pts[-1]))
+        else:
+            # 이후 스냅샷: 아직 못 본 pose 만 원래 ts 로 보간기에 넣고 애니메이션은 이어서
+            for i in np.flatnonzero(ts > self._last_pose_ts):
+                self._push_robot_pose(QPointF(*pts[i]), float(yaw[i]), float(ts[i]))
+        self._last_pose_ts = max(self._last_pose_ts or 0.0, float(ts[-1]))
+        self.ui.lbl_poses.setText(f"{len(self.trace)} pts")
+
+        self._lod_eps = None       # 다음 _update_lod 에서 반드시 1번 다시 그림
+        if was_empty:
+            self.fit_view()
+        else:
+            self._update_lod()
 
     def clear_all(self):
-        self.trace_data = []
-        self.path_item.setPath(QPainterPath())
+        self.trace.clear()
+        self.trajectory.clear()
         self.ui.lbl_poses.setText("0 pts")
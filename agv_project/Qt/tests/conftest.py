@@ -0,0 +1,8 @@
+# tests/conftest.py
+# 앱은 agv_project/Qt 에서 실행되므로 (from utils.x import ...) 같은 경로를 sys.path 에 추가
+import os
+import sys
+
+QT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if QT_DIR not in sys.path:
+    sys.path.insert(0, QT_DIR)
@@ -0,0 +1,41 @@
+# tests/test_infer_scheduler.py
+from utils.infer_scheduler import InferenceScheduler
+
+FPS = 30.0
+
+
+def run(sched, latency_s, seconds, t0=0.0, seq0=0):
+    """FPS 로 들어오는 프레임을 sched 대로 추론했다고 가정하고 시간을 진행"""
+    n = int(seconds * FPS)
+    for i in range(1, n + 1):
+        seq = seq0 + i
+        now = t0 + i / FPS
+        if sched.should_infer(seq, now):
+            sched.mark(seq, latency_s, now + latency_s)
+    return t0 + n / FPS, seq0 + n
+
+
+def test_fixed_stride_skips_frames():
+    s = InferenceScheduler(stride=3)
+    hits = []
+    for seq in range(1, 10):
+        if s.should_infer(seq, 0.0):
+            s.mark(seq, 0.01, 0.0)
+            hits.append(seq)
+    assert hits == [1, 4, 7]
+
+
+def test_adaptive_stride_goes_up_under_load():
+    s = InferenceScheduler(adaptive=True, busy_max=0.5, max_stride=8)
+    run(s, 0.050, 30.0)          # 30 fps x 50 ms = busy 1.5 @ stride 1
+    assert s.stride >= 3
+    assert s.busy <= 0.5
+
+
+def test_adaptive_stride_comes_back_down():
+    s = InferenceScheduler(adaptive=True, busy_max=0.5, max_stride=8)
+    t, seq = run(s, 0.050, 30.0)
+    high = s.stride
+    assert high > 1
+    run(s, 0.005, 30.0, t0=t, seq0=seq)   # 부하가 줄면 (latency 5 ms) 설정 stride 로 복귀
+    assert s.stride == 1
@@ -0,0 +1,45 @@
+# tests/test_yolo_labels.py
+from types import SimpleNamespace
+
+from utils.yolo_labels import apply_data_yaml, load_labels_from_data_yaml
+
+DATA_YAML = """\
+names:
+  0: laundry
+  1: water
+colors:
+  0: [0, 200, 0]
+  1: [255, 0, 0]
+"""
+
+
+def write_yaml(tmp_path, text=DATA_YAML):
+    path = tmp_path / "data.yaml"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_load_labels_from_data_yaml(tmp_path):
+    labels, colors = load_labels_from_data_yaml(write_yaml(tmp_path))
+    assert labels == ["laundry", "water"]
+    assert colors == {0: (0, 200, 0), 1: (255, 0, 0)}
+
+
+def test_apply_data_yaml_fills_empty_cfg(tmp_path):
+    cfg = SimpleNamespace(yolo_data_yaml=write_yaml(tmp_path), yolo_labels=None, yolo_colors=None)
+    assert apply_data_yaml(cfg)
+    assert cfg.yolo_labels == ["laundry", "water"]
+    assert cfg.yolo_colors[1] == (255, 0, 0)
+
+
+def test_apply_data_yaml_keeps_explicit_labels(tmp_path):
+    cfg = SimpleNamespace(yolo_data_yaml=write_yaml(tmp_path), yolo_labels=["a", "b"], yolo_colors=None)
+    apply_data_yaml(cfg)
+    assert cfg.yolo_labels == ["a", "b"]
+    assert cfg.yolo_colors[0] == (0, 200, 0)
+
+
+def test_apply_data_yaml_missing_file(tmp_path):
+    cfg = SimpleNamespace(yolo_data_yaml=str(tmp_path / "nope.yaml"), yolo_labels=None, yolo_colors=None)
+    assert not apply_data_yaml(cfg)
+    assert cfg.yolo_labels is None
@@ -0,0 +1,162 @@
+# tools/bench_vision.py
+"""녹화 영상으로 비전 파이프라인 전체를 headless 로 벤치마크.
+
+Jetson 스트림/USB 카메라 없이 영상 파일(또는 이미지 디렉터리)을 재생하면서
+CameraWorker 의 실제 프레임 처리 메서드를 그대로 돌린다.
+
+    read -> process_frame (scheduler / motion gate / preprocess / invoke / decode / nms / track)
+         -> render_frame (FrameRing convert) -> CameraView paint (draw)
+
+단계별 시간은 worker.metrics (VisionMetrics, 앱 overlay 와 같은 계측)에서 읽으므로
+워커 코드가 바뀌면 벤치마크 숫자도 그대로 따라간다. p50/p90/p99 는 히스토그램 bucket 근사값 (~10%).
+
+    python tools/bench_vision.py clip.mp4 --frames 300
+    python tools/bench_vision.py frames_dir/ --model models/best-int8.tflite --threads 2 --json out.json
+    python tools/bench_vision.py clip.mp4 --no-draw --no-gate
+"""
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# 화면 없는 환경에서도 CameraView 를 그릴 수 있도록
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtGui import QImage
+from PySide6.QtWidgets import QApplication
+
+from config import CFG
+from utils.camera_view import CameraView
+from utils.camera_worker import CameraWorker
+from utils.frame_source import open_replay
+from utils.vision_metrics import STAGES
+
+
+def print_report(snap, frames, wall_s):
+    rows = snap["stages_ms"]
+    print(f"\n{'stage':<11}{'n':>6}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}  (ms)")
+    for stage in STAGES:
+        r = rows.get(stage)
+        if r is None:
+            continue
+        print(f"{stage:<11}{r['n']:>6}{r['mean']:>9.2f}{r['p50']:>9.2f}{r['p90']:>9.2f}{r['p99']:>9.2f}{r['max']:>9.2f}")
+    fps = frames / wall_s if wall_s > 0 else 0.0
+    print(f"\nframes={frames}  wall={wall_s:.2f}s  fps={fps:.1f}  "
+          f"infer={snap['fps']['infer']:.1f}/s  gated={snap['gated']}  dets/infer={snap['dets_per_frame']:.2f}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("source", help="영상 파일 또는 이미지 디렉터리")
+    ap.add_argument("--model", default=None, help="cfg.yolo_model_path 대신 사용할 .tflite")
+    ap.add_argument("--frames", type=int, default=300, help="측정 프레임 수 (영상이 짧으면 반복 재생)")
+    ap.add_argument("--warmup", type=int, default=10)
+    ap.add_argument("--threads", type=int, default=None)
+    ap.add_argument("--delegate", default=None, help="auto | default | xnnpack | none")
+    ap.add_argument("--mode", default=None, help="stretch | letterbox")
+    ap.add_argument("--conf", type=float, default=None)
+    ap.add_argument("--pace", action="store_true", help="영상 fps 로 재생 (기본: 최대 속도)")
+    ap.add_argument("--no-gate", action="store_true", help="motion gate 끄기 (매 프레임 추론 비용 측정)")
+    ap.add_argument("--no-track", action="store_true", help="tracker 끄기")
+    ap.add_argument("--no-draw", action="store_true")
+    ap.add_argument("--view", default="960x540", help="draw 단계 CameraView 크기 WxH")
+    ap.add_argument("--json", default=None, help="결과를 json 으로 저장")
+    args = ap.parse_args()
+
+    cfg = CFG
+    if args.model:
+        cfg.yolo_model_path = args.model
+    if args.threads is not None:
+        cfg.yolo_num_threads = args.threads
+        cfg.yolo_autotune = False
+    if args.delegate:
+        cfg.yolo_delegate = args.delegate
+    if args.mode:
+        cfg.yolo_preprocess_mode = args.mode
+    if args.conf is not None:
+        cfg.yolo_conf_thres = args.conf
+    if args.no_gate:
+        cfg.yolo_motion_gate = False
+    if args.no_track:
+        cfg.yolo_track = False
+
+    app = QApplication.instance() or QApplication(sys.argv)  # CameraView 렌더링용
+
+    worker = CameraWorker(cfg)
+    worker.status.connect(print)
+    if not worker.load_model():
+        sys.exit(1)
+
+    src = open_replay(cfg, args.source, pace=args.pace, loop=True)
+    if not src.isOpened():
+        print(f"cannot open {args.source}")
+        sys.exit(1)
+    print(f"[BENCH] source={args.source} ({len(src)} frames/loop) model={cfg.yolo_model_path}")
+
+    view = canvas = None
+    if not args.no_draw:
+        vw, vh = (int(v) for v in args.view.lower().split("x"))
+        view = CameraView()
+        view.resize(vw, vh)
+        view.set_class_style(getattr(cfg, "yolo_labels", None), getattr(cfg, "yolo_colors", None))
+        view.attach_ring(worker.ring)
+        view.metrics = worker.metrics           # paint 시간을 draw 단계로 기록
+        worker.detectionsReady.connect(view.set_detections)
+        canvas = QImage(vw, vh, QImage.Format_RGB32)
+
+    m = worker.metrics
+    frames = 0
+    wall_t0 = None
+
+    for i in range(args.warmup + args.frames):
+        if i == args.warmup:
+            m.snapshot()            # warm-up 구간 버림
+            wall_t0 = time.perf_counter()
+        t0 = time.perf_counter()
+        ret, frame = src.read()
+        if not ret:
+            break
+        m.add("capture", time.perf_counter() - t0)
+        m.count("captured")
+        t_grab = time.monotonic()
+
+        worker.process_frame(i + 1, frame, t_grab)
+        worker.render_frame(frame, t_grab)
+        if view is not None:
+            view.render(canvas)
+        if wall_t0 is not None:
+            frames += 1
+
+    wall_s = time.perf_counter() - wall_t0 if wall_t0 is not None else 0.0
+    src.release()
+
+    snap = m.snapshot()
+    print_report(snap, frames, wall_s)
+
+    if args.json:
+        result = {
+            "source": args.source,
+            "model": cfg.yolo_model_path,
+            "threads": cfg.yolo_num_threads,
+            "delegate": cfg.yolo_delegate,
+            "preprocess_mode": cfg.yolo_preprocess_mode,
+            "motion_gate": bool(getattr(cfg, "yolo_motion_gate", True)),
+            "track": bool(getattr(cfg, "yolo_track", True)),
+            "frames": frames,
+            "wall_s": wall_s,
+            "fps": frames / wall_s if wall_s > 0 else 0.0,
+            "metrics": snap,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"[BENCH] saved {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# tools/bench_yolo_decode.py
+"""YOLO 출력 디코딩 micro-benchmark.
+
+기존 per-row 파이썬 루프와 utils/yolo_decode.py 의 벡터화 디코더를
+동일한 합성 출력 텐서(1, 25200, 5+nc)에 대해 비교한다.
+
+    python tools/bench_yolo_decode.py --iters 50 --nc 3
+"""
+from pathlib import Path
+import argparse
+import sys
+import time
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from utils.yolo_decode import decode_yolov5_raw
+
+
+def legacy_decode(out, frame_w, frame_h, conf_thres):
+    """이전 CameraWorker.parse_outputs 의 per-row 루프 (비교용)."""
+    dets = []
+    arr = np.array(out)
+    if arr.ndim == 3:
+        arr = arr[0]
+    for row in arr:
+        obj_conf = float(row[4])
+        if obj_conf < conf_thres:
+            continue
+        cx, cy, w, h = row[:4]
+        x1 = (cx - w / 2) * frame_w
+        y1 = (cy - h / 2) * frame_h
+        x2 = (cx + w / 2) * frame_w
+        y2 = (cy + h / 2) * frame_h
+        cls_id = int(np.argmax(row[5:]))
+        dets.append([x1, y1, x2, y2, obj_conf, cls_id])
+    return dets
+
+
+def make_fake_output(anchors, nc, pos_ratio, seed=0):
+    rng = np.random.default_rng(seed)
+    out = rng.random((1, anchors, 5 + nc), dtype=np.float32)
+    # 대부분의 앵커는 obj 가 낮음 (실제 출력 분포 흉내)
+    obj = out[0, :, 4]
+    obj *= 0.2
+    hot = rng.random(anchors) < pos_ratio
+    obj[hot] = 0.5 + 0.5 * rng.random(int(hot.sum()), dtype=np.float32)
+    out[0, :, 2:4] *= 0.3
+    return out
+
+
+def time_ms(fn, iters):
+    samples = []
+    for _ in range(iters):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    samples = np.asarray(samples)
+    return float(np.median(samples)), float(np.percentile(samples, 95))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--anchors", type=int, default=25200)
+    ap.add_argument("--nc", type=int, default=3)
+    ap.add_argument("--iters", type=int, default=30)
+    ap.add_argument("--conf", type=float, default=0.35)
+    ap.add_argument("--pos-ratio", type=float, default=0.002)
+    args = ap.parse_args()
+
+    out = make_fake_output(args.anchors, args.nc, args.pos_ratio)
+    W, H = 640, 480
+
+    vec = decode_yolov5_raw(out, W, H, conf_thres=args.conf, score_mode="obj")
+    ref = legacy_decode(out, W, H, args.conf)
+    assert vec.shape[0] == len(ref), (vec.shape, len(ref))
+    if len(ref):
+        assert np.allclose(vec, np.asarray(ref, dtype=np.float32), atol=1e-3)
+
+    leg_med, leg_p95 = time_ms(lambda: legacy_decode(out, W, H, args.conf), args.iters)
+    vec_med, vec_p95 = time_ms(lambda: decode_yolov5_raw(out, W, H, conf_thres=args.conf), args.iters)
+
+    print(f"output={out.shape} conf={args.conf} dets={vec.shape[0]}")
+    print(f"legacy loop : median {leg_med:8.3f} ms  p95 {leg_p95:8.3f} ms")
+    print(f"vectorized  : median {vec_med:8.3f} ms  p95 {vec_p95:8.3f} ms")
+    print(f"speedup     : x{leg_med / max(vec_med, 1e-9):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# utils/camera_service.py
+"""카메라 + YOLO 추론 단일 서비스.
+
+이전에는 MainWindow 와 ControlPage 가 각각 CameraWorker 를 만들어서
+GStreamer UDP 포트를 두 번 열고 TFLite 모델도 두 번 로드했다.
+
+CameraService 는 CameraWorker(캡처 + interpreter) 를 정확히 1개만 소유하고,
+프레임(seq)/검출/상태 시그널을 그대로 내보낸다. Qt 시그널이라 구독자는 몇 개든 연결할 수 있다.
+  - 구독자: acquire() 로 사용 시작, release() 로 종료 -> 첫 구독에서 start, 마지막 해제에서 stop
+  - ring / metrics / latest_detections() 는 worker 것을 그대로 노출 (ControlPage.attach_camera 와 호환)
+  - swap_model() / set_thresholds() 로 실행 중 모델/threshold 변경
+"""
+from PySide6.QtCore import QObject, Signal
+
+from utils.camera_worker import CameraWorker
+
+
+class CameraService(QObject):
+    frameIndexReady = Signal(int)      # FrameRing seq
+    detectionsReady = Signal(object)   # (N,6) float32
+    status = Signal(str)
+    metricsReady = Signal(object)      # VisionMetrics snapshot (1초마다)
+    modelSwapped = Signal(str)
+
+    def __init__(self, cfg, parent=None):
+        super().__init__(parent)
+        self.cfg = cfg
+        self._users = 0
+
+        self.worker = CameraWorker(cfg)
+        # signal -> signal 연결 (fan-out 은 Qt 가 처리)
+        self.worker.frameIndexReady.connect(self.frameIndexReady)
+        self.worker.detectionsReady.connect(self.detectionsReady)
+        self.worker.status.connect(self.status)
+        self.worker.metricsReady.connect(self.metricsReady)
+        self.worker.modelSwapped.connect(self.modelSwapped)
+
+    @property
+    def ring(self):
+        return self.worker.ring
+
+    @property
+    def metrics(self):
+        return self.worker.metrics
+
+    def latest_detections(self):
+        return self.worker.latest_detections()
+
+    def swap_model(self, model_path):
+        """실행 중 모델 교체 (예: int8 <-> fp16 A/B). 재시작 없음"""
+        return self.worker.swap_model(model_path)
+
+    def set_thresholds(self, conf=None, iou=None):
+        self.worker.set_thresholds(conf=conf, iou=iou)
+
+    def is_running(self):
+        return self.worker.isRunning()
+
+    def acquire(self):
+        """구독 시작. 첫 구독자일 때 worker 를 시작한다."""
+        self._users += 1
+        if not self.worker.isRunning():
+            self.worker.start()
+
+    def release(self):
+        """구독 종료. 마지막 구독자면 worker 를 멈춘다."""
+        self._users = max(0, self._users - 1)
+        if self._users == 0:
+            self.shutdown()
+
+    def shutdown(self, timeout_ms=2000):
+        self._users = 0
+        if self.worker.isRunning():
+            self.worker.stop()
+            self.worker.wait(timeout_ms)
@@ -0,0 +1,268 @@
+# utils/camera_view.py
+"""카메라 영상 + YOLO 검출 overlay 위젯.
+
+이전에는 워커 스레드에서 cv2.rectangle/putText 로 프레임 자체에 박스를 그린 뒤
+QPixmap 으로 만들고, ControlPage 에서 다시 scaled(SmoothTransformation) 했다.
+
+CameraView 는
+  - 프레임과 검출 결과((N,6) ndarray)를 따로 받아서
+  - paintEvent 에서 프레임을 위젯 크기에 맞춰 1번만 스케일해 그리고
+  - 그 위에 QPainter 로 박스/라벨을 그린다.
+그래서 overlay 토글(boxes/labels)은 프레임을 다시 만들 필요 없이 update() 만 하면 된다.
+
+프레임 소스 2가지
+  - attach_ring(FrameRing) + on_frame_index(seq): worker 는 seq 만 보내고,
+    paintEvent 에서 ring 의 최신 RGB 버퍼를 QImage 로 감싸 그린다 (복사/QPixmap 생성 없음)
+  - set_frame(QPixmap): 기존 방식 (YoloTFLiteWorker 등)
+
+ring 소스는 프레임 캡처 시각을 같이 들고 있으므로, 캡처(appsink) -> 화면 paint 지연을
+EMA 로 측정해 latencyReport(ms) 로 주기적으로 알린다.
+
+계측: metrics(VisionMetrics) 가 연결돼 있으면 paint 시간(draw)/횟수를 기록하고,
+set_stats(snapshot) 으로 받은 요약을 좌상단 stats overlay 로 그린다 (우상단 FPS 버튼으로 토글).
+"""
+import time
+
+import numpy as np
+
+from PySide6.QtCore import Qt, QRectF, QPointF, Signal
+from PySide6.QtGui import QPainter, QPen, QColor, QFont, QImage
+from PySide6.QtWidgets import QWidget, QSizePolicy, QToolButton
+
+from utils.vision_metrics import format_overlay
+
+DEFAULT_BOX_COLOR = QColor(0, 255, 0)
+
+
+def class_qcolors(colors):
+    """cfg.yolo_colors ({cls: (B,G,R)}, OpenCV 순서) -> {cls: QColor}"""
+    if not isinstance(colors, dict):
+        return {}
+    return {int(k): QColor(int(v[2]), int(v[1]), int(v[0])) for k, v in colors.items()}
+
+
+def paint_detections(painter, dets, sx, sy, ox=0.0, oy=0.0,
+                     labels=None, qcolors=None, draw_boxes=True, draw_labels=True):
+    """(N,6) dets 를 painter 에 그린다. 좌표 변환: (x * sx + ox, y * sy + oy)
+
+    tracker 출력 (N,7) 이면 7번째 열(track_id)을 라벨에 같이 표시한다.
+    """
+    if dets is None or len(dets) == 0 or not (draw_boxes or draw_labels):
+        return
+    qcolors = qcolors or {}
+    fm = painter.fontMetrics()
+    pen = QPen(DEFAULT_BOX_COLOR, 2)
+    has_id = dets.shape[1] > 6
+    for row in dets:
+        x1, y1, x2, y2, score, cls_id = row[:6]
+        cid = int(cls_id)
+        pen.setColor(qcolors.get(cid, DEFAULT_BOX_COLOR))
+        painter.setPen(pen)
+        rect = QRectF(x1 * sx + ox, y1 * sy + oy, (x2 - x1) * sx, (y2 - y1) * sy)
+
+        if draw_boxes:
+            painter.drawRect(rect)
+
+        if draw_labels:
+            if isinstance(labels, (list, tuple)) and 0 <= cid < len(labels):
+                name = labels[cid]
+            else:
+                name = f"cls{cid}"
+            text = f"#{int(row[6])} {name} {score:.2f}" if has_id else f"{name} {score:.2f}"
+            painter.drawText(QPointF(rect.left(), max(fm.ascent(), rect.top() - 4)), text)
+
+
+class CameraView(QWidget):
+    latencyReport = Signal(float)   # 캡처 -> paint 지연 EMA (ms)
+    statsToggled = Signal(bool)
+
+    LATENCY_EMA_ALPHA = 0.1
+
+    def __init__(self, parent=None, placeholder="WAITING FOR CAMERA...", report_interval_s=10.0):
+        super().__init__(parent)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setAttribute(Qt.WA_OpaquePaintEvent, True)
+
+        self._pixmap = None
+        self._ring = None
+        self._ring_seq = 0       # 마지막으로 그린 ring seq
+        self._dets = None
+        self._placeholder = placeholder
+
+        self.display_latency_ms = None
+        self._report_interval_s = float(report_interval_s)
+        self._last_report = time.monotonic()
+
+        self.labels = None
+        self._qcolors = {}
+        self.draw_boxes = True
+        self.draw_labels = True
+        self.smooth = True
+
+        self._font = QFont(self.font())
+        self._font.setPointSize(9)
+        self._font.setBold(True)
+
+        # 계측 / stats overlay
+        self.metrics = None
+        self.show_stats = False
+        self._stats_lines = []
+        self._stats_font = QFont(self.font())
+        self._stats_font.setPointSize(8)
+        self.btn_stats = QToolButton(self)
+        self.btn_stats.setText("FPS")
+        self.btn_stats.setCheckable(True)
+        self.btn_stats.setFixedSize(34, 18)
+        self.btn_stats.setStyleSheet(
+            "QToolButton { font-size: 9px; color: #ddd; background: rgba(0,0,0,120); border: 1px solid #555; border-radius: 3px; }"
+            "QToolButton:checked { color: #10b981; border-color: #10b981; }"
+        )
+        self.btn_stats.toggled.connect(self.set_stats_overlay)
+
+    # -------------------------
+    # data
+    # -------------------------
+    def attach_ring(self, ring):
+        """FrameRing 소스 연결 (None 이면 해제)"""
+        self._ring = ring
+        self._ring_seq = 0
+        self.update()
+
+    def on_frame_index(self, seq):
+        # 여러 seq 가 한 번에 와도 update() 가 합쳐지므로 repaint 는 1번
+        if seq != self._ring_seq:
+            self.update()
+
+    def set_frame(self, pixmap):
+        if pixmap is None or pixmap.isNull():
+            return
+        self._pixmap = pixmap
+        self.update()
+
+    def set_detections(self, dets):
+        self._dets = None if dets is None else np.asarray(dets, dtype=np.float32)
+        self.update()
+
+    def clear(self):
+        self._pixmap = None
+        self._ring = None
+        self._dets = None
+        self.update()
+
+    # -------------------------
+    # overlay style / toggles
+    # -------------------------
+    def set_class_style(self, labels=None, colors=None):
+        self.labels = labels
+        self._qcolors = class_qcolors(colors)
+        self.update()
+
+    def set_stats_overlay(self, enabled):
+        enabled = bool(enabled)
+        if enabled == self.show_stats:
+            return
+        self.show_stats = enabled
+        self.btn_stats.setChecked(enabled)
+        self.statsToggled.emit(enabled)
+        self.update()
+
+    def set_stats(self, snapshot):
+        """VisionMetrics snapshot -> overlay 문자열 (표시 중일 때만 다시 그림)"""
+        self._stats_lines = format_overlay(snapshot, self.display_latency_ms) if snapshot else []
+        if self.show_stats:
+            self.update()
+
+    def set_overlay(self, boxes=None, labels=None):
+        if boxes is not None:
+            self.draw_boxes = bool(boxes)
+        if labels is not None:
+            self.draw_labels = bool(labels)
+        self.update()
+
+    # -------------------------
+    # paint
+    # -------------------------
+    def resizeEvent(self, event):
+        self.btn_stats.move(self.width() - self.btn_stats.width() - 4, 4)
+        super().resizeEvent(event)
+
+    def _target_rect(self, pw, ph):
+        """KeepAspectRatio 로 위젯 중앙에 맞춘 영상 영역"""
+        scale = min(self.width() / pw, self.height() / ph)
+        w, h = pw * scale, ph * scale
+        return QRectF((self.width() - w) / 2.0, (self.height() - h) / 2.0, w, h), scale
+
+    def _paint_overlay(self, p, target, scale):
+        p.setFont(self._font)
+        paint_detections(
+            p, self._dets, scale, scale, target.left(), target.top(),
+            labels=self.labels, qcolors=self._qcolors,
+            draw_boxes=self.draw_boxes, draw_labels=self.draw_labels,
+        )
+
+    def _track_latency(self, stamp):
+        now = time.monotonic()
+        ms = (now - stamp) * 1000.0
+        if self.display_latency_ms is None:
+            self.display_latency_ms = ms
+        else:
+            self.display_latency_ms += self.LATENCY_EMA_ALPHA * (ms - self.display_latency_ms)
+        if now - self._last_report >= self._report_interval_s:
+            self._last_report = now
+            self.latencyReport.emit(self.display_latency_ms)
+
+    def _paint_ring(self, p):
+        with self._ring.read_latest() as (buf, seq, stamp):
+            if buf is None:
+                return False
+            if stamp and seq != self._ring_seq:
+                self._track_latency(stamp)
+            h, w = buf.shape[:2]
+            # buf 는 이 블록 안에서 pin 되어 있으므로 복사 없이 감싸서 바로 그린다
+            img = QImage(buf.data, w, h, buf.strides[0], QImage.Format_RGB888)
+            target, scale = self._target_rect(w, h)
+            p.drawImage(target, img, QRectF(0, 0, w, h))
+            self._ring_seq = seq
+        self._paint_overlay(p, target, scale)
+        return True
+
+    def _paint_stats(self, p):
+        if not (self.show_stats and self._stats_lines):
+            return
+        p.setFont(self._stats_font)
+        fm = p.fontMetrics()
+        lh = fm.height()
+        w = max(fm.horizontalAdvance(line) for line in self._stats_lines) + 8
+        p.fillRect(QRectF(2, 2, w, lh * len(self._stats_lines) + 4), QColor(0, 0, 0, 150))
+        p.setPen(QColor("#e5e7eb"))
+        for i, line in enumerate(self._stats_lines):
+            p.drawText(QPointF(6, 4 + fm.ascent() + i * lh), line)
+
+    def _paint_frame(self, p):
+        if self._ring is not None and self._paint_ring(p):
+            return True
+
+        if self._pixmap is None:
+            p.setPen(QColor("#777"))
+            p.drawText(self.rect(), Qt.AlignCenter, self._placeholder)
+            return False
+
+        target, scale = self._target_rect(self._pixmap.width(), self._pixmap.height())
+        p.drawPixmap(target, self._pixmap, QRectF(self._pixmap.rect()))
+        self._paint_overlay(p, target, scale)
+        return True
+
+    def paintEvent(self, event):
+        t0 = time.perf_counter()
+        p = QPainter(self)
+        p.fillRect(self.rect(), Qt.black)
+        if self.smooth:
+            p.setRenderHint(QPainter.SmoothPixmapTransform, True)
+
+        painted = self._paint_frame(p)
+        self._paint_stats(p)
+        p.end()
+
+        if painted and self.metrics is not None:
+            self.metrics.add("draw", time.perf_counter() - t0)
+            self.metrics.count("painted")
@@ -1,144 +1,385 @@
 import cv2
 import numpy as np
+import threading
 import time
-from PySide6.QtCore import QThread, Signal, Qt
-from PySide6.QtGui import QImage, QPixmap
+from PySide6.QtCore import QThread, Signal
 
-try:
-    from tflite_runtime.interpreter import Interpreter
-except ImportError:
-    from tensorflow.lite.python.interpreter import Interpreter
+from utils.yolo_decode import (
+    decode_yolov5_raw, decode_nmsed, boxes_look_normalized, output_layout, output_quant,
+)
+from utils.yolo_nms import nms_from_cfg
+from utils.frame_pipeline import LatestSlot, FrameRing
+from utils.frame_source import open_capture
+from utils.infer_scheduler import InferenceScheduler
+from utils.tflite_loader import build_interpreter, make_interpreter
+from utils.yolo_preprocess import InputPreprocessor, infer_rois
+from utils.yolo_tracker import SortTracker
+from utils.motion_gate import MotionGate
+from utils.vision_metrics import VisionMetrics
 
 # ==========================================
-# 1. 후처리용 NMS 함수 (기존 로직 유지)
-# ==========================================
-def _bbox_iou_xyxy(a, b):
-    ax1, ay1, ax2, ay2 = a
-    bx1, by1, bx2, by2 = b[..., 0], b[..., 1], b[..., 2], b[..., 3]
-    inter_x1 = np.maximum(ax1, bx1)
-    inter_y1 = np.maximum(ay1, by1)
-    inter_x2 = np.minimum(ax2, bx2)
-    inter_y2 = np.minimum(ay2, by2)
-    inter_w = np.maximum(0.0, inter_x2 - inter_x1)
-    inter_h = np.maximum(0.0, inter_y2 - inter_y1)
-    inter = inter_w * inter_h
-    area_a = np.maximum(0.0, ax2 - ax1) * np.maximum(0.0, ay2 - ay1)
-    area_b = np.maximum(0.0, bx2 - bx1) * np.maximum(0.0, by2 - by1)
-    return inter / (area_a + area_b - inter + 1e-9)
-
-def nms_xyxy(dets, iou_thres=0.45):
-    if not dets: return []
-    dets = np.asarray(dets, dtype=np.float32)
-    boxes = dets[:, :4]
-    scores = dets[:, 4]
-    order = scores.argsort()[::-1]
-    keep = []
-    while order.size > 0:
-        i = int(order[0])
-        keep.append(i)
-        if order.size == 1: break
-        ious = _bbox_iou_xyxy(boxes[i], boxes[order[1:]])
-        inds = np.where(ious <= iou_thres)[0]
-        order = order[inds + 1]
-    return dets[keep].tolist()
-
-# ==========================================
-# 2. 통합 카메라 & 추론 워커
+# 통합 카메라 & 추론 워커
 # ==========================================
+# 3-stage 파이프라인:
+#   grabber thread   : cap.read() 만 반복 -> frame slot ((frame, 캡처 시각))
+#   inference thread : frame slot 의 최신 프레임으로 추론 -> det slot
+#   render (QThread) : 새 프레임을 FrameRing 슬롯에 RGB 로 기록 -> frameIndexReady(seq)
+# slot 은 1칸짜리 latest-wins 버퍼이므로 추론이 느려도 캡처/표시는 카메라 fps 를 유지한다.
+# GUI 는 seq 만 받고, 자기 repaint 때 ring 의 최신 버퍼를 복사 없이 그린다 (QPixmap 생성 없음).
+# 검출 결과는 프레임에 그리지 않고 detectionsReady((N,6) ndarray) 로 따로 보낸다
+# (overlay 는 utils/camera_view.CameraView 가 QPainter 로 그림)
+# cfg.yolo_track 이면 SortTracker 를 거친 (M,7) [..., track_id] 를 보내고,
+# 추론을 건너뛴 프레임에서도 tracker 예측 결과를 보낸다.
+# 단계별 시간/카운터는 self.metrics(VisionMetrics) 에 모이고, render 루프가
+# cfg.vision_metrics_interval_s 마다 snapshot 을 metricsReady(dict) 로 보낸다.
+# 런타임 변경 (재시작 없이):
+#   swap_model(path)      : 별도 스레드에서 load + allocate + warm-up 후, inference thread 가
+#                           다음 프레임 직전에 통째로 교체 (추론 루프는 멈추지 않음)
+#   set_thresholds(conf, iou): cfg 값만 바꾸므로 다음 추론부터 바로 적용
+# cfg.yolo_motion_gate 이면 장면 변화가 없는 프레임은 추론하지 않고 마지막 검출을 재사용한다
+# (utils/motion_gate.py, 충전 중 정지 상태의 CPU/발열 감소)
 class CameraWorker(QThread):
-    frameReady = Signal(QPixmap)
+    frameIndexReady = Signal(int)      # FrameRing seq
+    detectionsReady = Signal(object)   # (N,6) float32 [x1,y1,x2,y2,score,cls] (+ track_id 열) (프레임 좌표)
     status = Signal(str)
+    metricsReady = Signal(object)      # VisionMetrics.snapshot() dict
+    modelSwapped = Signal(str)         # 교체 완료된 모델 경로
 
     def __init__(self, cfg, parent=None):
         super().__init__(parent)
         self.cfg = cfg
         self.running = False
 
-        # TFLite 모델 초기화
+        self._frame_slot = LatestSlot()   # grabber -> inference / render
+        self._det_slot = LatestSlot()     # inference -> latest_detections()
+        self.ring = FrameRing(slots=3)    # render -> GUI
+        self.dropped_infer = 0            # 추론이 건너뛴 프레임 수
+        self.dropped_render = 0           # 화면 송출이 건너뛴 프레임 수
+
+        # 추론 주기 (stride / max_hz / adaptive). 건너뛴 프레임엔 마지막 검출 결과를 그린다
+        self.scheduler = InferenceScheduler.from_cfg(cfg)
+        # 검출 -> 트랙 (inference thread 에서만 사용)
+        self.tracker = SortTracker.from_cfg(cfg) if getattr(cfg, "yolo_track", True) else None
+        # 정지 장면 추론 생략 (inference thread 에서만 사용)
+        self.motion_gate = MotionGate.from_cfg(cfg) if getattr(cfg, "yolo_motion_gate", True) else None
+        self._gate_reset = False          # 다른 스레드의 reset 요청 (inference thread 가 가져가서 처리)
+
+        # 단계별 계측 (grabber / inference / render / GUI paint 공용)
+        self.metrics = VisionMetrics()
+        self.metrics_interval_s = float(getattr(cfg, "vision_metrics_interval_s", 1.0))
+
+        # TFLite 모델은 inference thread 시작 시 로드 (autotune 벤치마크가 GUI 를 막지 않도록)
+        self.interpreter = None
+        self._threads_delegate = None     # 현재 모델의 (threads, delegate), swap 때 재사용
+        self._pending_model = None        # swap_model 이 준비한 bundle (inference thread 가 적용)
+        self._swap_thread = None
+
+    def _build_model(self, model_path, threads_delegate=None):
+        """interpreter + 입력/출력 정보 + 전처리기 묶음 (현재 모델과 독립적으로 생성)
+
+        threads_delegate 를 주면 autotune 없이 그 설정으로 만든다 (추론 중 swap: 벤치마크가 경합으로 부정확함)
+        """
+        if threads_delegate is not None:
+            n, d = threads_delegate
+            interpreter = make_interpreter(model_path, n, d, getattr(self.cfg, "yolo_xnnpack_lib", ""))
+        else:
+            interpreter, n, d, _ = build_interpreter(self.cfg, model_path=model_path, log=self.status.emit)
+        input_detail = interpreter.get_input_details()[0]
+        output_details = interpreter.get_output_details()
+        _, in_h, in_w, _ = input_detail["shape"]
+        # 출력 형식은 로드 시 1번만 판정 (raw / NMS 포함 export)
+        layout = output_layout(output_details[0], getattr(self.cfg, "yolo_output_layout", "auto"))
+        return {
+            "path": model_path,
+            "interpreter": interpreter,
+            "input_detail": input_detail,
+            "output_details": output_details,
+            "in_w": in_w,
+            "in_h": in_h,
+            "out_quant": output_quant(output_details[0]),   # int8 모델이면 (scale, zp)
+            "layout": layout,
+            "prep": InputPreprocessor(
+                interpreter, input_detail,
+                mode=getattr(self.cfg, "yolo_preprocess_mode", "stretch"),
+            ),
+            "threads_delegate": (n, d),
+            "desc": f"threads={n}, delegate={d}, output={layout}",
+        }
+
+    def _apply_model(self, m):
+        # inference thread 에서만 호출 (추론 중간에 바뀌지 않도록)
+        self.interpreter = m["interpreter"]
+        self.input_detail = m["input_detail"]
+        self.output_details = m["output_details"]
+        self.in_w, self.in_h = m["in_w"], m["in_h"]
+        self.out_quant = m["out_quant"]
+        self.out_layout = m["layout"]
+        self.nmsed_normalized = None   # NMS export 좌표가 0~1 인지 (첫 검출에서 판정)
+        self._prep = m["prep"]
+        self._threads_delegate = m["threads_delegate"]
+
+    def load_model(self):
         try:
-            self.interpreter = Interpreter(model_path=cfg.yolo_model_path)
-            self.interpreter.allocate_tensors()
-            self.input_detail = self.interpreter.get_input_details()[0]
-            self.output_details = self.interpreter.get_output_details()
-            _, self.in_h, self.in_w, _ = self.input_detail["shape"]
-            self.status.emit(f"YOLO Model Loaded: {cfg.yolo_model_path}")
+            m = self._build_model(self.cfg.yolo_model_path)
+            self._apply_model(m)
+            self.status.emit(f"YOLO Model Loaded: {m['path']} ({m['desc']})")
+            return True
         except Exception as e:
+            self.interpreter = None
             self.status.emit(f"Model Load Error: {e}")
+            return False
+
+    # -------------------------
+    # runtime changes
+    # -------------------------
+    def swap_model(self, model_path):
+        """모델 교체 요청. 준비는 별도 스레드, 교체는 inference thread 의 프레임 경계에서.
+
+        반환: 요청 수락 여부 (이미 교체 준비 중이면 False)
+        """
+        if self._swap_thread is not None and self._swap_thread.is_alive():
+            self.status.emit(f"[YOLO] swap busy, ignored: {model_path}")
+            return False
+        self._swap_thread = threading.Thread(
+            target=self._prepare_swap, args=(model_path,), name="yolo-swap", daemon=True,
+        )
+        self._swap_thread.start()
+        return True
+
+    def _prepare_swap(self, model_path):
+        t0 = time.perf_counter()
+        try:
+            # 추론이 돌고 있으면 같은 코어를 쓰므로 autotune 대신 현재 설정 재사용
+            m = self._build_model(model_path, self._threads_delegate)
+            # warm-up: 최신 프레임(없으면 빈 입력)으로 2번 invoke -> 첫 추론 지연을 여기서 소모
+            item = self._frame_slot.peek()[1]
+            if item is not None:
+                m["prep"](item[0])
+            for _ in range(2):
+                m["interpreter"].invoke()
+        except Exception as e:
+            self.status.emit(f"[YOLO] swap failed ({model_path}): {e}")
+            return
+        m["ready_s"] = time.perf_counter() - t0
+        self._pending_model = m    # 참조 대입 1번 -> inference thread 가 다음 프레임 전에 가져감
+
+    def _take_pending_model(self):
+        m = self._pending_model
+        if m is None:
+            return
+        self._pending_model = None
+        self._apply_model(m)
+        self.cfg.yolo_model_path = m["path"]
+        # 클래스 구성/속도가 다를 수 있으므로 트랙과 추론 주기 통계는 새로 시작
+        if self.tracker is not None:
+            self.tracker.reset()
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
+        self.scheduler = InferenceScheduler.from_cfg(self.cfg)
+        self.status.emit(f"[YOLO] swapped -> {m['path']} ({m['desc']}, ready in {m['ready_s']:.1f}s)")
+        self.modelSwapped.emit(m["path"])
+
+    def set_thresholds(self, conf=None, iou=None):
+        """confidence / NMS IoU 변경 (다음 추론부터 적용, 락 없음)"""
+        if conf is not None:
+            self.cfg.yolo_conf_thres = float(conf)
+        if iou is not None:
+            self.cfg.yolo_nms_iou = float(iou)
+        # 정지 장면이어도 바뀐 threshold 로 한 번 다시 추론 (gate 는 inference thread 에서만 건드림)
+        self._gate_reset = True
+        self.status.emit(f"[YOLO] thresholds conf={self.cfg.yolo_conf_thres:.2f} iou={self.cfg.yolo_nms_iou:.2f}")
 
     def preprocess(self, frame):
-        img = cv2.resize(frame, (self.in_w, self.in_h))
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        img = img.astype(np.float32) / 255.0
-        return np.expand_dims(img, axis=0)
+        # 입력 텐서에 직접 기록 (set_tensor 불필요)
+        self._prep(frame)
 
     def parse_outputs(self, out, frame_w, frame_h):
-        dets = []
-        arr = np.array(out)
-        if arr.ndim == 3: arr = arr[0]
-
-        for row in arr:
-            obj_conf = float(row[4])
-            if obj_conf < self.cfg.yolo_conf_thres: continue
-
-            # 중앙 좌표 기반 -> xyxy 변환
-            cx, cy, w, h = row[:4]
-            x1 = (cx - w / 2) * frame_w
-            y1 = (cy - h / 2) * frame_h
-            x2 = (cx + w / 2) * frame_w
-            y2 = (cy + h / 2) * frame_h
-
-            cls_id = int(np.argmax(row[5:]))
-            dets.append([x1, y1, x2, y2, obj_conf, cls_id])
+        # 벡터화 디코더: (N,6) float32 [x1,y1,x2,y2,score,cls]
+        if self.out_layout == "nmsed":
+            return self._parse_nmsed(out, frame_w, frame_h)
+        return decode_yolov5_raw(
+            out, frame_w, frame_h,
+            conf_thres=self.cfg.yolo_conf_thres,
+            score_mode=getattr(self.cfg, "yolo_score_mode", "obj_cls"),
+            quant=self.out_quant,
+        )
+
+    def _parse_nmsed(self, out, frame_w, frame_h):
+        # NMS 포함 export: score 마스킹만 하면 끝 (post-processing 거의 0)
+        norm = self.nmsed_normalized
+        dets = decode_nmsed(
+            out, frame_w, frame_h,
+            conf_thres=self.cfg.yolo_conf_thres,
+            quant=self.out_quant,
+            normalized=bool(norm),
+        )
+        if norm is None and len(dets):
+            self.nmsed_normalized = boxes_look_normalized(dets)
+            if self.nmsed_normalized:
+                dets[:, 0:4:2] *= frame_w
+                dets[:, 1:4:2] *= frame_h
         return dets
 
-    def draw_boxes(self, frame, dets):
-        for x1, y1, x2, y2, score, cls_id in dets:
-            color = (0, 255, 0) # Green
-            cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), color, 2)
-            label = f"ID:{int(cls_id)} {score:.2f}"
-            cv2.putText(frame, label, (int(x1), int(y1)-10),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-        return frame
+    def stop(self):
+        self.running = False
 
-    def run(self):
-        # 젯슨 나노 GStreamer 수신 (포트 5000)
-        pipeline = (
-            "udpsrc port=5000 ! "
-            "application/x-rtp, payload=96 ! "
-            "rtph264depay ! avdec_h264 ! "
-            "videoconvert ! appsink drop=true"
-        )
-        cap = cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER)
+    def latest_detections(self):
+        """가장 최근 추론 결과 (N,6). 아직 없으면 None."""
+        return self._det_slot.peek()[1]
 
-        if not cap.isOpened():
-            self.status.emit("GStreamer Connection Failed (Port 5000)")
-            return
+    def infer(self, frame):
+        """프레임 1장 추론 -> (N,6) dets (cfg.yolo_rois 가 있으면 ROI 만 추론)"""
+        dets = infer_rois(frame, getattr(self.cfg, "yolo_rois", None), self._infer_image)
+        t0 = time.perf_counter()
+        dets = nms_from_cfg(dets, self.cfg)
+        self.metrics.add("nms", time.perf_counter() - t0)
+        return dets
 
-        self.running = True
+    def _infer_image(self, img):
+        """이미지(프레임 또는 ROI crop) 1장 추론 -> img 좌표 (N,6) dets (NMS 전)"""
+        m = self.metrics
+        # 1. 추론 전처리 (입력 텐서에 직접 기록)
+        t0 = time.perf_counter()
+        self.preprocess(img)
+
+        # 2. 모델 추론
+        t1 = time.perf_counter()
+        self.interpreter.invoke()
+
+        # 3. 결과 파싱
+        t2 = time.perf_counter()
+        raw_out = self.interpreter.get_tensor(self.output_details[0]["index"])
+        # 모델 입력 픽셀 좌표로 디코딩 후 img 좌표로 되돌림 (stretch / letterbox 공통)
+        dets = self._prep.unmap(self.parse_outputs(raw_out, self.in_w, self.in_h))
+        t3 = time.perf_counter()
+
+        m.add("preprocess", t1 - t0)
+        m.add("invoke", t2 - t1)
+        m.add("decode", t3 - t2)
+        return dets
+
+    def _grab_loop(self, cap):
+        # cap.read() 도중 release 되지 않도록 release 는 grabber 가 직접 한다
+        try:
+            while self.running:
+                t0 = time.perf_counter()
+                ret, frame = cap.read()
+                if not ret or frame is None:
+                    if getattr(cap, "ended", False):
+                        self.status.emit("Replay finished")
+                        break
+                    time.sleep(0.01)   # 끊김/재연결 중: busy loop 방지
+                    continue
+                self.metrics.add("capture", time.perf_counter() - t0)
+                self.metrics.count("captured")
+                self._frame_slot.put((frame, time.monotonic()))
+        finally:
+            cap.release()
+
+    def _infer_loop(self):
+        if self.interpreter is None and self._pending_model is None and not self.load_model():
+            # 모델 없이 영상만 표시. swap_model 로 쓸 수 있는 모델이 오면 그때부터 추론
+            self.status.emit("[YOLO] no model, waiting for swap_model")
+        last_seq = 0
         while self.running:
-            ret, frame = cap.read()
-            if not ret or frame is None: continue
+            if self._pending_model is not None:
+                self._take_pending_model()
+            if self.interpreter is None:
+                time.sleep(0.1)
+                continue
+            seq, item = self._frame_slot.wait_newer(last_seq, timeout=0.1)
+            if item is None:
+                continue
+            frame, t_grab = item
+            if last_seq and seq - last_seq > 1:
+                self.dropped_infer += seq - last_seq - 1
+                self.metrics.count("dropped_infer", seq - last_seq - 1)
+            last_seq = seq
+            self.process_frame(seq, frame, t_grab)
+
+    def process_frame(self, seq, frame, t_grab):
+        """inference stage 프레임 1장: 스케줄 -> motion gate -> 추론 -> 트랙 -> 발행 (tools/bench_vision 도 사용)
 
-            # 1. 추론 전처리
-            inp = self.preprocess(frame)
+        어느 단계에서 예외가 나도 로그만 남기고 다음 프레임으로 (inference thread 가 조용히 죽지 않게)
+        """
+        try:
+            if self._gate_reset:
+                self._gate_reset = False
+                if self.motion_gate is not None:
+                    self.motion_gate.reset()
+            if not self.scheduler.should_infer(seq):
+                if self.tracker is not None and len(self.tracker):
+                    # 추론 사이 프레임: 트랙을 캡처 시각으로 예측만 해서 보냄
+                    tracks = self.tracker.predict(t_grab)
+                    self._det_slot.put(tracks)
+                    self.detectionsReady.emit(tracks)
+                return
+            # 새 물체(미확인 트랙)가 있으면 장면이 멈춰 보여도 확인될 때까지 계속 추론
+            tentative = self.tracker is not None and self.tracker.has_tentative()
+            if self.motion_gate is not None and not tentative and not self.motion_gate.should_infer(frame, t_grab):
+                # 장면 변화 없음 -> 마지막 검출 유지, 트랙은 정지 상태로 붙잡아 둠
+                self.metrics.count("gated")
+                if self.tracker is not None:
+                    self.tracker.hold(t_grab)
+                return
+            t0 = time.perf_counter()
+            dets = self.infer(frame)
+            self.scheduler.mark(seq, time.perf_counter() - t0)
+            self.metrics.count("inferred")
+            self.metrics.count("detections", len(dets))
+            if self.tracker is not None:
+                t1 = time.perf_counter()
+                dets = self.tracker.update(dets, t_grab)
+                self.metrics.add("track", time.perf_counter() - t1)
+            self._det_slot.put(dets)
+            self.detectionsReady.emit(dets)
+        except Exception as e:
+            self.status.emit(f"Inference Error: {e}")
+            time.sleep(0.5)
 
-            # 2. 모델 추론
-            self.interpreter.set_tensor(self.input_detail["index"], inp)
-            self.interpreter.invoke()
+    def render_frame(self, frame, t_grab):
+        """render stage 프레임 1장: FrameRing 에 RGB 로 기록하고 GUI 에 seq 알림"""
+        t0 = time.perf_counter()
+        ring_seq = self.ring.write(frame, t_grab)
+        if ring_seq:
+            self.metrics.add("convert", time.perf_counter() - t0)
+            self.metrics.count("rendered")
+            self.frameIndexReady.emit(ring_seq)
 
-            # 3. 결과 파싱 및 NMS
-            raw_out = self.interpreter.get_tensor(self.output_details[0]["index"])
-            dets = self.parse_outputs(raw_out, frame.shape[1], frame.shape[0])
-            dets = nms_xyxy(dets, iou_thres=getattr(self.cfg, "yolo_iou_thres", 0.45))
+    def run(self):
+        # 젯슨 나노 GStreamer 수신 (cfg.cam_source/cam_port/cam_decoder), 실패 시 cam_fallback
+        cap, _ = open_capture(self.cfg, log=self.status.emit)
+        if cap is None:
+            self.status.emit(f"Camera Connection Failed ({getattr(self.cfg, 'cam_source', 'gstreamer')})")
+            return
+
+        self.running = True
+        threads = [
+            threading.Thread(target=self._grab_loop, args=(cap,), name="cam-grab", daemon=True),
+            threading.Thread(target=self._infer_loop, name="cam-infer", daemon=True),
+        ]
+        for t in threads:
+            t.start()
+
+        # render / convert stage
+        last_seq = 0
+        next_report = time.monotonic() + self.metrics_interval_s
+        while self.running:
+            now = time.monotonic()
+            if self.metrics_interval_s > 0 and now >= next_report:
+                next_report = now + self.metrics_interval_s
+                self.metricsReady.emit(self.metrics.snapshot())
 
-            # 4. 박스 그리기
-            frame = self.draw_boxes(frame, dets)
+            seq, item = self._frame_slot.wait_newer(last_seq, timeout=0.1)
+            if item is None:
+                continue
+            if last_seq and seq - last_seq > 1:
+                self.dropped_render += seq - last_seq - 1
+                self.metrics.count("dropped_render", seq - last_seq - 1)
+            last_seq = seq
 
-            # 5. QPixmap 변환 및 송출
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            h, w, ch = rgb.shape
-            bytes_per_line = ch * w
-            qimg = QImage(rgb.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            self.frameReady.emit(QPixmap.fromImage(qimg))
+            frame, t_grab = item
+            self.render_frame(frame, t_grab)
 
-        cap.release()
+        for t in threads:
+            t.join(timeout=1.0)
@@ -0,0 +1,129 @@
+# utils/detection_publisher.py
+"""HMI YOLO 검출 요약을 MQTT 로 발행.
+
+CameraService.detectionsReady 는 프레임 단위로 오기 때문에 그대로 보내면 broker 가 넘친다.
+DetectionPublisher 는
+  - (N,6)/(M,7) dets 를 작은 요약으로 줄이고 (class 별 개수, 가장 가까운 물체, track id 목록)
+  - 요약이 바뀌었을 때만 보내고 (dedup)
+  - 초당 최대 max_hz 번으로 제한한다. 제한에 걸린 변경은 버리지 않고 다음 허용 시각에 마지막 상태만 보낸다.
+  - 변화가 없어도 heartbeat_s 마다 한 번은 보내서 구독자가 "살아 있음" 을 알 수 있게 한다.
+
+topic  : /robot/<robot_id>/inference/yolo
+payload: {"ts": epoch ms, "n": 3, "counts": {"laundry": 2, "water": 1}, "tracks": [4, 7, 9],
+          "nearest": {"label": "laundry", "cls": 0, "conf": 0.81, "box": [x1, y1, x2, y2], "id": 7}}
+가장 가까운 물체 = 박스 아래쪽(y2)이 화면 아래에 가장 가까운 것 (전방 카메라 기준)
+"""
+import time
+
+import numpy as np
+
+from PySide6.QtCore import QObject, QTimer
+
+
+class DetectionPublisher(QObject):
+    def __init__(self, cfg, mqtt, parent=None):
+        super().__init__(parent)
+        self.cfg = cfg
+        self.mqtt = mqtt
+        self.topic = f"/robot/{cfg.robot_id}/inference/yolo"
+
+        max_hz = float(getattr(cfg, "yolo_mqtt_max_hz", 2.0))
+        self.min_interval = 1.0 / max_hz if max_hz > 0 else 0.0
+        self.heartbeat_s = float(getattr(cfg, "yolo_mqtt_heartbeat_s", 5.0))
+        self.box_quant = max(1, int(getattr(cfg, "yolo_mqtt_box_quant_px", 16)))
+
+        self.active = False        # MQTT 연결 상태
+        self.published = 0
+        self.suppressed = 0        # dedup/rate limit 으로 보내지 않은 횟수
+
+        self._last_key = None
+        self._last_pub_t = 0.0
+        self._pending = None       # rate limit 으로 밀린 (key, payload)
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.timeout.connect(self._flush)
+
+    def set_active(self, active):
+        self.active = bool(active)
+        if not self.active:
+            self._flush_timer.stop()
+            self._pending = None
+            self._last_key = None   # 재연결되면 현재 상태를 바로 다시 보냄
+
+    # -------------------------
+    # summary
+    # -------------------------
+    def _label(self, cid):
+        labels = getattr(self.cfg, "yolo_labels", None)
+        if isinstance(labels, (list, tuple)) and 0 <= cid < len(labels):
+            return labels[cid]
+        return f"cls{cid}"
+
+    def summarize(self, dets):
+        """dets -> (dedup key, payload dict)"""
+        dets = np.asarray(dets, dtype=np.float32)
+        if dets.ndim != 2 or dets.shape[0] == 0:
+            return ((), (), None), {"n": 0, "counts": {}, "tracks": [], "nearest": None}
+
+        cls_ids, counts = np.unique(dets[:, 5].astype(np.int32), return_counts=True)
+        count_map = {self._label(int(c)): int(n) for c, n in zip(cls_ids, counts)}
+
+        has_id = dets.shape[1] > 6
+        tracks = sorted(int(t) for t in dets[:, 6]) if has_id else []
+
+        i = int(np.argmax(dets[:, 3]))
+        x1, y1, x2, y2, score, cid = (float(v) for v in dets[i, :6])
+        nearest = {
+            "label": self._label(int(cid)),
+            "cls": int(cid),
+            "conf": round(score, 3),
+            "box": [round(x1, 1), round(y1, 1), round(x2, 1), round(y2, 1)],
+        }
+        if has_id:
+            nearest["id"] = int(dets[i, 6])
+
+        # 박스 좌표는 몇 px 흔들려도 같은 상태로 본다
+        near_key = (nearest.get("id"), int(cid), int(y2) // self.box_quant, int((x1 + x2) * 0.5) // self.box_quant)
+        key = (tuple(zip(cls_ids.tolist(), counts.tolist())), tuple(tracks), near_key)
+        payload = {"n": int(dets.shape[0]), "counts": count_map, "tracks": tracks, "nearest": nearest}
+        return key, payload
+
+    # -------------------------
+    # publish
+    # -------------------------
+    def on_detections(self, dets):
+        if not self.active:
+            return
+        key, payload = self.summarize(dets)
+        now = time.monotonic()
+
+        if key == self._last_key and now - self._last_pub_t < self.heartbeat_s:
+            self._pending = None
+            self.suppressed += 1
+            return
+
+        wait = self.min_interval - (now - self._last_pub_t)
+        if wait > 0:
+            # 너무 빠름 -> 마지막 상태만 들고 있다가 허용 시각에 발행
+            self._pending = (key, payload)
+            self.suppressed += 1
+            if not self._flush_timer.isActive():
+                self._flush_timer.start(int(wait * 1000) + 1)
+            return
+
+        self._publish(key, payload, now)
+
+    def _flush(self):
+        if self._pending is None or not self.active:
+            return
+        key, payload = self._pending
+        self._pending = None
+        self._publish(key, payload, time.monotonic())
+
+    def _publish(self, key, payload, now):
+        payload["ts"] = int(time.time() * 1000)
+        self.mqtt.publish(self.topic, payload)
+        self._last_key = key
+        self._last_pub_t = now
+        self.published += 1
@@ -0,0 +1,132 @@
+# utils/frame_pipeline.py
+"""카메라 파이프라인 stage 간 연결용 버퍼.
+
+LatestSlot: 1칸짜리 "latest frame wins" 버퍼
+  - 생산자(put)는 절대 block 되지 않는다. 소비되지 않은 이전 값은 그냥 덮어쓴다.
+  - 소비자는 각자 마지막으로 본 seq 를 들고 있다가 wait_newer(last_seq) 로 더 새로운 값을 기다린다.
+    (값을 꺼내 가지 않으므로 여러 소비자가 같은 슬롯을 읽을 수 있음)
+  - 소비자가 건너뛴 개수 = (새 seq - last_seq - 1)
+
+grabber -> [frame slot] -> inference -> [det slot]
+                        -> render -> [FrameRing] -> GUI (CameraView)
+"""
+import threading
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+
+class LatestSlot:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._seq = 0
+
+    @property
+    def seq(self):
+        return self._seq
+
+    def put(self, item):
+        with self._cond:
+            self._item = item
+            self._seq += 1
+            self._cond.notify_all()
+            return self._seq
+
+    def peek(self):
+        """기다리지 않고 현재 (seq, item) 반환 (아직 없으면 (0, None))."""
+        with self._cond:
+            return self._seq, self._item
+
+    def wait_newer(self, last_seq, timeout=None):
+        """seq > last_seq 인 값이 들어올 때까지 대기.
+
+        timeout 이 지나면 (last_seq, None) 을 반환한다.
+        """
+        with self._cond:
+            if self._seq <= last_seq:
+                self._cond.wait_for(lambda: self._seq > last_seq, timeout)
+            if self._seq <= last_seq:
+                return last_seq, None
+            return self._seq, self._item
+
+
+class FrameRing:
+    """미리 할당한 RGB 버퍼 N 개를 돌려 쓰는 프레임 링 버퍼 (worker -> GUI).
+
+    - worker: write(frame_bgr) 가 BGR->RGB 변환을 빈 슬롯에 바로 기록 (cvtColor dst=)하고 seq 를 반환.
+      GUI 로는 seq(int) 만 시그널로 보낸다. (프레임마다 QPixmap 생성/복사 없음)
+    - GUI  : paintEvent 에서 read_latest() 로 최신 슬롯을 잠깐 pin 하고 QImage 로 감싸서(복사 없음) 그린다.
+    - 쓰기 대상은 "최신 슬롯도 아니고 읽는 중도 아닌 슬롯 중 가장 오래된 것" 이므로
+      GUI 가 그리고 있는 버퍼를 worker 가 덮어쓰지 않는다.
+    """
+
+    def __init__(self, slots=3):
+        self._lock = threading.Lock()
+        self._n = max(3, int(slots))
+        self._bufs = []
+        self._shape = None
+        self._seqs = [0] * self._n
+        self._stamps = [0.0] * self._n   # 캡처 시각 (time.monotonic)
+        self._readers = [0] * self._n
+        self._latest = -1
+        self.seq = 0
+        self.skipped = 0   # 빈 슬롯이 없어 버린 프레임 수
+
+    def _ensure(self, shape):
+        if shape != self._shape:
+            # 해상도가 바뀌면 새로 할당 (읽는 쪽은 이전 배열 참조를 들고 있으므로 안전)
+            self._bufs = [np.empty(shape, dtype=np.uint8) for _ in range(self._n)]
+            self._shape = shape
+            self._seqs = [0] * self._n
+            self._latest = -1
+
+    def write(self, frame_bgr, stamp=0.0):
+        """frame 을 RGB 로 변환해 빈 슬롯에 기록. 기록한 seq (빈 슬롯이 없으면 0)
+
+        stamp: 프레임 캡처 시각 (time.monotonic), 표시 지연 측정용
+        """
+        with self._lock:
+            self._ensure(frame_bgr.shape)
+            idx = -1
+            for i in range(self._n):
+                if i == self._latest or self._readers[i]:
+                    continue
+                if idx < 0 or self._seqs[i] < self._seqs[idx]:
+                    idx = i
+            if idx < 0:
+                self.skipped += 1
+                return 0
+            buf = self._bufs[idx]
+
+        cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB, dst=buf)
+
+        with self._lock:
+            if buf is not self._bufs[idx]:   # 기록 도중 해상도 변경
+                return 0
+            self.seq += 1
+            self._seqs[idx] = self.seq
+            self._stamps[idx] = stamp
+            self._latest = idx
+            return self.seq
+
+    @contextmanager
+    def read_latest(self):
+        """with ring.read_latest() as (buf, seq, stamp): ...
+
+        buf 는 블록 안에서만 유효. 아직 프레임이 없으면 (None, 0, 0.0)
+        """
+        with self._lock:
+            idx = self._latest
+            if idx < 0:
+                buf, seq, stamp = None, 0, 0.0
+            else:
+                self._readers[idx] += 1
+                buf, seq, stamp = self._bufs[idx], self._seqs[idx], self._stamps[idx]
+        try:
+            yield buf, seq, stamp
+        finally:
+            if idx >= 0:
+                with self._lock:
+                    self._readers[idx] -= 1
@@ -0,0 +1,236 @@
+# utils/frame_source.py
+"""카메라 입력 소스 생성 (GStreamer UDP / V4L2 / 파일).
+
+CameraWorker 에 하드코딩돼 있던
+  udpsrc port=5000 ! ... avdec_h264 ! videoconvert ! appsink drop=true
+를 cfg 기반 빌더로 바꾼다.
+  - cam_source   : "gstreamer" | "v4l2" | "file"
+  - cam_decoder  : "auto" | "v4l2h264dec" | "avdec_h264" | ... (auto: HW 디코더 우선)
+  - appsink max-buffers=1 drop=true sync=false  -> 항상 최신 프레임만, 클럭 대기 없음
+  - videoconvert/videoscale 에서 BGR + 목표 해상도로 바로 변환 (Python 쪽 resize/cvtColor 없음)
+  - 열기 실패 시 cam_fallback 순서대로 V4L2(camera_index) / 파일 소스 시도
+
+file 소스 (ReplaySource)
+  Jetson 스트림/USB 카메라 없이 녹화 영상(.mp4 등) 또는 이미지 디렉터리를 재생한다.
+  cv2.VideoCapture 와 같은 read()/isOpened()/release() 인터페이스라 워커 코드는 그대로 쓴다.
+  - cam_replay_fps  : 재생 속도 (0 이면 영상 fps, 디렉터리는 30)
+  - cam_replay_pace : False 면 sleep 없이 최대 속도로 읽음 (벤치마크용)
+  - cam_replay_loop : 끝나면 처음부터 다시
+"""
+import os
+import time
+
+import cv2
+
+# auto 일 때 시도 순서 (RPi: v4l2h264dec 가 HW 디코더)
+H264_DECODERS = ("v4l2h264dec", "avdec_h264")
+
+try:
+    import gi
+    gi.require_version("Gst", "1.0")
+    from gi.repository import Gst
+    Gst.init(None)
+except Exception:  # gi 가 없으면 플러그인 확인 없이 기본값 사용
+    Gst = None
+
+
+def gst_has_element(name):
+    """GStreamer 플러그인 존재 여부 (확인 불가하면 None)"""
+    if Gst is None:
+        return None
+    return Gst.ElementFactory.find(name) is not None
+
+
+def pick_h264_decoder(pref="auto"):
+    if pref and pref != "auto":
+        return pref
+    for name in H264_DECODERS:
+        if gst_has_element(name):
+            return name
+    return "avdec_h264"
+
+
+def build_udp_h264_pipeline(cfg):
+    """Jetson 이 보내는 RTP/H264 UDP 스트림 수신 파이프라인 문자열."""
+    port = int(getattr(cfg, "cam_port", 5000))
+    decoder = pick_h264_decoder(getattr(cfg, "cam_decoder", "auto"))
+    jitter_ms = int(getattr(cfg, "cam_jitter_latency_ms", 0))
+    w = int(getattr(cfg, "camera_width", 0) or 0)
+    h = int(getattr(cfg, "camera_height", 0) or 0)
+
+    parts = [
+        f"udpsrc port={port}",
+        "application/x-rtp, media=video, encoding-name=H264, payload=96",
+    ]
+    if jitter_ms > 0:
+        parts.append(f"rtpjitterbuffer latency={jitter_ms} drop-on-latency=true")
+    parts += ["rtph264depay", "h264parse", decoder, "videoconvert"]
+
+    # 스케일/색 변환은 GStreamer 에서 끝내고 BGR 로 받는다
+    raw_caps = "video/x-raw, format=BGR"
+    if w > 0 and h > 0:
+        parts.append("videoscale")
+        raw_caps += f", width={w}, height={h}"
+    parts.append(raw_caps)
+    parts.append("appsink max-buffers=1 drop=true sync=false")
+    return " ! ".join(parts)
+
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+DEFAULT_REPLAY_FPS = 30.0
+
+
+class ReplaySource:
+    """영상 파일 / 이미지 디렉터리 재생 소스 (cv2.VideoCapture 호환 최소 인터페이스)."""
+
+    def __init__(self, path, fps=0.0, pace=True, loop=True):
+        self.path = path
+        self.loop = bool(loop)
+        self.pace = bool(pace)
+        self.frames_read = 0
+        self.ended = False         # loop=False 에서 끝까지 재생함 (더 읽을 프레임 없음)
+
+        self._cap = None
+        self._files = None
+        self._pos = 0
+        if os.path.isdir(path):
+            self._files = sorted(
+                os.path.join(path, f) for f in os.listdir(path)
+                if f.lower().endswith(IMAGE_EXTS)
+            )
+            native_fps = 0.0
+        else:
+            self._cap = cv2.VideoCapture(path)
+            native_fps = self._cap.get(cv2.CAP_PROP_FPS) if self._cap.isOpened() else 0.0
+
+        self.fps = float(fps or native_fps or DEFAULT_REPLAY_FPS)
+        self._period = 1.0 / self.fps
+        self._next_t = None
+
+    def isOpened(self):
+        if self._files is not None:
+            return len(self._files) > 0
+        return self._cap is not None and self._cap.isOpened()
+
+    def __len__(self):
+        """한 바퀴 프레임 수 (모르면 0)"""
+        if self._files is not None:
+            return len(self._files)
+        return int(self._cap.get(cv2.CAP_PROP_FRAME_COUNT)) if self._cap is not None else 0
+
+    def _read_raw(self):
+        if self._files is not None:
+            if self._pos >= len(self._files):
+                return False, None
+            frame = cv2.imread(self._files[self._pos], cv2.IMREAD_COLOR)
+            self._pos += 1
+            return frame is not None, frame
+        return self._cap.read()
+
+    def _rewind(self):
+        self.ended = False
+        if self._files is not None:
+            self._pos = 0
+        else:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+    def _wait_turn(self):
+        # 절대 시각 기준으로 맞춰서 sleep 오차가 누적되지 않게 한다
+        now = time.monotonic()
+        if self._next_t is None or now - self._next_t > 1.0:
+            self._next_t = now      # 시작 / 오래 멈췄다 재개 -> 기준 재설정
+        elif self._next_t > now:
+            time.sleep(self._next_t - now)
+        self._next_t += self._period
+
+    def read(self):
+        if not self.isOpened():
+            return False, None
+        ret, frame = self._read_raw()
+        if not ret and self.loop:
+            self._rewind()
+            ret, frame = self._read_raw()
+        if not ret:
+            self.ended = not self.loop
+            return False, None
+        if self.pace:
+            self._wait_turn()
+        self.frames_read += 1
+        return True, frame
+
+    def release(self):
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+        self._files = None
+
+
+def open_replay(cfg, path=None, **overrides):
+    """cfg.cam_replay_* 로 ReplaySource 생성 (overrides 로 fps/pace/loop 덮어쓰기 가능)"""
+    opts = dict(
+        fps=getattr(cfg, "cam_replay_fps", 0.0),
+        pace=getattr(cfg, "cam_replay_pace", True),
+        loop=getattr(cfg, "cam_replay_loop", True),
+    )
+    opts.update(overrides)
+    return ReplaySource(path or getattr(cfg, "cam_file_path", ""), **opts)
+
+
+def _open_gstreamer(cfg):
+    pipeline = build_udp_h264_pipeline(cfg)
+    return cv2.VideoCapture(pipeline, cv2.CAP_GSTREAMER), f"gstreamer: {pipeline}"
+
+
+def _open_v4l2(cfg):
+    index = int(getattr(cfg, "camera_index", 0))
+    cap = cv2.VideoCapture(index, cv2.CAP_V4L2)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, getattr(cfg, "camera_width", 640))
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, getattr(cfg, "camera_height", 480))
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap, f"v4l2: /dev/video{index}"
+
+
+def _open_file(cfg):
+    path = getattr(cfg, "cam_file_path", "")
+    if not path:
+        return None, "file: (cam_file_path 없음)"
+    src = open_replay(cfg, path)
+    return src, f"file: {path} ({src.fps:.1f} fps, loop={src.loop})"
+
+
+_OPENERS = {
+    "gstreamer": _open_gstreamer,
+    "v4l2": _open_v4l2,
+    "file": _open_file,
+}
+
+
+def open_capture(cfg, log=print, sources=None):
+    """cfg.cam_source 로 열고, 실패하면 cfg.cam_fallback 순서대로 시도.
+
+    sources 를 주면 cfg 대신 그 순서로 시도한다.
+    반환: (cap, desc) / 모두 실패하면 (None, None)
+    """
+    if sources:
+        order = list(sources)
+    else:
+        order = [getattr(cfg, "cam_source", "gstreamer")]
+        order += [s for s in getattr(cfg, "cam_fallback", ()) if s not in order]
+
+    for source in order:
+        opener = _OPENERS.get(source)
+        if opener is None:
+            log(f"[CAM] unknown source: {source}")
+            continue
+        try:
+            cap, desc = opener(cfg)
+        except Exception as e:
+            log(f"[CAM] {source} open error: {e}")
+            continue
+        if cap is not None and cap.isOpened():
+            log(f"[CAM] opened {desc}")
+            return cap, desc
+        log(f"[CAM] open failed -> {desc}")
+        if cap is not None:
+            cap.release()
+    return None, None
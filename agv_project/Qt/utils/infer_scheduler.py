@@ -0,0 +1,90 @@
+# utils/infer_scheduler.py
+"""YOLO 추론 주기 스케줄러 (frame skipping).
+
+매 프레임 추론하면 RPi HMI 의 CPU 코어 하나가 계속 100% 가 되므로,
+  - stride : N 프레임마다 1번만 추론
+  - max_hz : 초당 최대 추론 횟수 제한 (0 이면 제한 없음)
+을 적용한다. 추론하지 않은 프레임에는 마지막 검출 결과를 그대로 그린다 (carry-over).
+
+adaptive=True 이면 추론 스레드의 busy 비율 (구간 내 추론 시간 합 / 경과 시간)을 보고 stride 를 조절한다.
+invoke 1회 latency 는 stride 와 무관하지만 busy 비율은 stride 에 반비례하므로 양쪽으로 수렴한다.
+  - busy > busy_max                           -> stride + 1 (max_stride 까지)
+  - stride - 1 로 줄였을 때 예상 busy (busy * stride / (stride - 1)) 가 busy_max 의 80% 미만 -> stride - 1
+"""
+import time
+
+
+class InferenceScheduler:
+    # 몇 번의 추론마다 busy 비율을 보고 stride 를 조정할지
+    ADAPT_EVERY = 10
+    EMA_ALPHA = 0.2
+    # stride 를 줄이는 조건의 여유 (진동 방지)
+    DOWN_MARGIN = 0.8
+
+    def __init__(self, stride=1, max_hz=0.0, adaptive=False, busy_max=0.5, max_stride=8):
+        self.base_stride = max(1, int(stride))
+        self.stride = self.base_stride
+        self.max_hz = float(max_hz or 0.0)
+        self.adaptive = bool(adaptive)
+        self.busy_max = float(busy_max)
+        self.max_stride = max(self.base_stride, int(max_stride))
+
+        self.latency_ema = None
+        self.busy = None           # 마지막 조정 구간의 busy 비율
+        self._last_seq = None
+        self._last_t = None
+        self._since_adapt = 0
+        self._win_t0 = None
+        self._win_busy = 0.0
+
+    @classmethod
+    def from_cfg(cls, cfg):
+        return cls(
+            stride=getattr(cfg, "yolo_infer_stride", 1),
+            max_hz=getattr(cfg, "yolo_infer_max_hz", 0.0),
+            adaptive=getattr(cfg, "yolo_adaptive_stride", False),
+            busy_max=getattr(cfg, "yolo_infer_busy_max", 0.5),
+            max_stride=getattr(cfg, "yolo_max_stride", 8),
+        )
+
+    def should_infer(self, frame_seq, now=None):
+        """frame_seq 번째 프레임을 추론할지 여부."""
+        if self._last_seq is not None and frame_seq - self._last_seq < self.stride:
+            return False
+        if self.max_hz > 0.0 and self._last_t is not None:
+            now = time.monotonic() if now is None else now
+            if now - self._last_t < 1.0 / self.max_hz:
+                return False
+        return True
+
+    def mark(self, frame_seq, latency_s, now=None):
+        """추론 1회 완료 기록 (latency_s: preprocess~NMS 소요 시간)."""
+        now = time.monotonic() if now is None else now
+        self._last_seq = frame_seq
+        self._last_t = now
+
+        if self.latency_ema is None:
+            self.latency_ema = latency_s
+        else:
+            self.latency_ema += self.EMA_ALPHA * (latency_s - self.latency_ema)
+
+        if not self.adaptive:
+            return
+        if self._win_t0 is None:
+            self._win_t0 = now     # 첫 추론: 구간 시작점만 잡음
+            return
+        self._win_busy += latency_s
+        self._since_adapt += 1
+        if self._since_adapt < self.ADAPT_EVERY:
+            return
+
+        wall = now - self._win_t0
+        self.busy = self._win_busy / wall if wall > 0 else 1.0
+        if self.busy > self.busy_max and self.stride < self.max_stride:
+            self.stride += 1
+        elif (self.stride > self.base_stride
+              and self.busy * self.stride / (self.stride - 1) < self.DOWN_MARGIN * self.busy_max):
+            self.stride -= 1
+        self._win_t0 = now
+        self._win_busy = 0.0
+        self._since_adapt = 0
@@ -0,0 +1,104 @@
+# utils/map_ripple.py
+"""MapPage 로봇 위치 파동(ripple) 효과 - item 재사용 + 공유 타이머 1개.
+
+이전 create_ripple 은 1.5초마다 RippleItem(QObject + QGraphicsEllipseItem + QPropertyAnimation)을
+새로 만들고 끝나면 scene 에서 지웠고, 애니메이션 프레임마다 set_rect_prop 이 QPen 을 새로 만들었다.
+RipplePool 은
+  - pool_size 개의 QGraphicsEllipseItem 을 미리 scene 에 넣어 두고 숨겼다 보였다만 하고
+  - QTimer 1개가 모든 ripple 의 진행도(QEasingCurve.valueForProgress)를 계산해서 rect 를 갱신하며
+  - 투명도/두께는 pen_levels 단계로 양자화한 QPen 을 미리 만들어 두고 단계가 바뀔 때만 setPen 한다.
+stop() 하면 타이머가 멈추고 item 을 숨겨서, 맵 페이지가 안 보일 때는 비용이 0 이다.
+"""
+import time
+
+from PySide6.QtCore import Qt, QTimer, QEasingCurve
+from PySide6.QtGui import QColor, QPen
+from PySide6.QtWidgets import QGraphicsEllipseItem
+
+
+class RipplePool:
+    def __init__(self, scene, anchor, color="#60a5fa", pool_size=3, period_ms=1500, duration_ms=1800,
+                 start_px=10.0, max_px=250.0, width_px=5.0, fps=30, pen_levels=32, z=999, parent=None):
+        """anchor() -> 파동 중심 QPointF (None 이면 새 파동을 만들지 않음)"""
+        self.anchor = anchor
+        self.period_s = period_ms / 1000.0
+        self.duration_s = duration_ms / 1000.0
+        self.start_px = float(start_px)
+        self.max_px = float(max_px)
+        self.curve = QEasingCurve(QEasingCurve.OutExpo)   # 부드럽게 퍼지다가 멈춤
+
+        # 진행도(크기 비율) 단계별 pen: 퍼질수록 투명해지고 얇아짐
+        base = QColor(color)
+        self.pen_levels = max(2, int(pen_levels))
+        self._pens = []
+        for i in range(self.pen_levels + 1):
+            progress = i / self.pen_levels
+            c = QColor(base)
+            c.setAlpha(max(0, int(255 * (1.0 - progress))))
+            self._pens.append(QPen(c, max(1.0, width_px * (1.0 - progress))))
+
+        self._items = []
+        self._start_t = []         # slot 별 시작 시각 (None = 쉬는 중)
+        self._level = []           # slot 별 현재 pen 단계
+        for _ in range(max(1, int(pool_size))):
+            item = QGraphicsEllipseItem()
+            item.setBrush(Qt.NoBrush)
+            item.setZValue(z)
+            item.setVisible(False)
+            scene.addItem(item)
+            self._items.append(item)
+            self._start_t.append(None)
+            self._level.append(-1)
+        self._last_spawn = None
+
+        self.timer = QTimer(parent)
+        self.timer.setInterval(max(1, int(1000 / max(1.0, float(fps)))))
+        self.timer.timeout.connect(self._tick)
+
+    def start(self):
+        if not self.timer.isActive():
+            self._last_spawn = None    # 다시 보이면 바로 1개 시작
+            self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+        for i, item in enumerate(self._items):
+            item.setVisible(False)
+            self._start_t[i] = None
+
+    def _spawn(self, now):
+        pos = self.anchor()
+        if pos is None:
+            return
+        # 빈 slot, 없으면 가장 오래된 것 재사용
+        free = [i for i, t in enumerate(self._start_t) if t is None]
+        i = free[0] if free else min(range(len(self._items)), key=lambda k: self._start_t[k])
+        item = self._items[i]
+        item.setPos(pos)
+        self._start_t[i] = now
+        self._level[i] = -1
+        self._last_spawn = now
+
+    def _tick(self):
+        now = time.monotonic()
+        if self._last_spawn is None or now - self._last_spawn >= self.period_s:
+            self._spawn(now)
+
+        for i, t0 in enumerate(self._start_t):
+            if t0 is None:
+                continue
+            item = self._items[i]
+            p = (now - t0) / self.duration_s
+            if p >= 1.0:
+                item.setVisible(False)
+                self._start_t[i] = None
+                continue
+            size = self.start_px + (self.max_px - self.start_px) * self.curve.valueForProgress(p)
+            half = size * 0.5
+            item.setRect(-half, -half, size, size)
+            level = min(self.pen_levels, int(size / self.max_px * self.pen_levels))
+            if level != self._level[i]:
+                item.setPen(self._pens[level])
+                self._level[i] = level
+            if not item.isVisible():
+                item.setVisible(True)
@@ -0,0 +1,271 @@
+# utils/map_trajectory.py
+"""MapPage 궤적(trajectory) 을 chunk 단위 QGraphicsPathItem 으로 그리는 모델.
+
+이전 MapPage.on_event_added 는 pose 1개가 올 때마다 trace_data 전체로 QPainterPath 를
+새로 만들어서, 점 N 개째 추가 비용이 O(N), load_events(300개) 는 O(N^2) 였다.
+
+ChunkedTrajectory 는
+  - 마지막(live) chunk 의 path 에 lineTo 로 새 구간만 붙이고
+  - chunk 가 chunk_size 점에 도달하면 봉인(seal)하고 새 chunk 를 시작한다
+    (새 chunk 는 이전 chunk 의 마지막 점에서 moveTo 로 이어짐)
+그래서 점 1개 추가 비용은 전체 길이와 무관하게 chunk 크기로 제한되고,
+bounding rect 갱신/repaint 도 live chunk 영역에서만 일어난다.
+
+set_points(xy) 는 전체 궤적을 한 번에 다시 만든다 (load_events 의 bulk 경로):
+chunk 마다 QPolygonF -> addPolygon 1번으로 path 를 만들고 item 도 chunk 당 1번만 setPath 한다.
+
+긴 주행(한 교대 분량) 용 점 수 줄이기:
+  - TraceBuffer: pose 를 QPointF list 대신 (N,2) float64 배열에 저장 (용량 2배씩 증가).
+    직전 저장점과 min_step 보다 가까운 점은 버리고 (정지/미세 흔들림),
+    max_points 를 넘으면 Douglas-Peucker 로 오차를 2배씩 키워 가며 압축한다.
+  - decimate_distance / simplify_dp: 누적 거리 기준 솎기와 Douglas-Peucker 단순화 (NumPy 벡터화).
+    MapPage 는 이걸로 줌 배율에 맞는 거친 polyline(LOD)을 만들어 그린다.
+"""
+import math
+
+import numpy as np
+
+from PySide6.QtCore import QPointF, QRectF
+from PySide6.QtGui import QPainterPath, QPolygonF
+from PySide6.QtWidgets import QGraphicsPathItem
+
+DEFAULT_CHUNK_SIZE = 64
+
+
+def decimate_distance(xy, step):
+    """누적 경로 길이가 step 을 넘을 때마다 1점씩 남긴다 (처음/끝 점은 항상 유지)"""
+    n = len(xy)
+    if n < 3 or step <= 0:
+        return xy
+    seg = np.hypot(*np.diff(xy, axis=0).T)
+    bins = np.floor(np.concatenate(([0.0], np.cumsum(seg))) / step)
+    keep = np.empty(n, dtype=bool)
+    keep[0] = True
+    keep[1:] = bins[1:] != bins[:-1]
+    keep[-1] = True
+    return xy[keep]
+
+
+def simplify_dp(xy, eps):
+    """Douglas-Peucker: 선분과의 거리가 eps 이하인 중간 점을 제거.
+
+    재귀 대신 "분할 단계" 단위로 처리한다: 한 단계에서 아직 남은 모든 구간의
+    점-선분 거리와 구간별 최대값을 배열 연산 1번으로 구하므로 파이썬 루프는 단계 수(~log N)만큼만 돈다.
+    """
+    n = len(xy)
+    if n < 3 or eps <= 0:
+        return xy
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    open_ = ~keep                  # 아직 판정 안 된 중간 점
+    while open_.any():
+        idx = np.flatnonzero(keep)
+        pts = np.flatnonzero(open_)
+        seg = np.searchsorted(idx, pts) - 1          # idx[seg] < p < idx[seg+1]
+        a = xy[idx[seg]]
+        d = xy[idx[seg + 1]] - a
+        rel = xy[pts] - a
+        dd = np.einsum("ij,ij->i", d, d)
+        # 무한 직선이 아니라 선분까지 거리 (왔던 길을 되돌아가는 구간이 지워지지 않게)
+        t = np.einsum("ij,ij->i", rel, d) / np.where(dd > 0, dd, 1.0)
+        np.clip(t, 0.0, 1.0, out=t)
+        dist = np.hypot(rel[:, 0] - t * d[:, 0], rel[:, 1] - t * d[:, 1])
+
+        starts = np.flatnonzero(np.r_[True, seg[1:] != seg[:-1]])
+        counts = np.diff(np.r_[starts, len(pts)])
+        seg_max = np.maximum.reduceat(dist, starts)
+        at_max = dist == np.repeat(seg_max, counts)
+        _, first = np.unique(seg[at_max], return_index=True)
+        split_pt = pts[at_max][first]                 # 구간별 최대 거리 점
+        split = seg_max > eps
+
+        open_[pts[~np.repeat(split, counts)]] = False  # 오차 안쪽 구간은 통째로 확정(제거)
+        keep[split_pt[split]] = True
+        open_[split_pt[split]] = False
+    return xy[keep]
+
+
+class TraceBuffer:
+    """궤적 점 저장소 ((N,2) float64, scene 좌표)"""
+
+    def __init__(self, min_step=0.0, max_points=20000, capacity=1024):
+        self.min_step = float(min_step)
+        self.max_points = max(16, int(max_points))
+        self._buf = np.empty((capacity, 2), dtype=np.float64)
+        self._n = 0
+        self.compactions = 0
+
+    def __len__(self):
+        return self._n
+
+    def points(self):
+        """저장된 점 (view, 복사 없음)"""
+        return self._buf[:self._n]
+
+    def last(self):
+        if self._n == 0:
+            return None
+        x, y = self._buf[self._n - 1]
+        return QPointF(x, y)
+
+    def clear(self):
+        self._n = 0
+
+    def append(self, x, y):
+        """점 추가. min_step 안쪽이라 버렸으면 False"""
+        if self._n:
+            lx, ly = self._buf[self._n - 1]
+            if math.hypot(x - lx, y - ly) < self.min_step:
+                return False
+        if self._n == len(self._buf):
+            self._buf = np.concatenate([self._buf, np.empty_like(self._buf)])
+        self._buf[self._n] = (x, y)
+        self._n += 1
+        if self._n > self.max_points:
+            self.compact()
+        return True
+
+    def set(self, xy, eps=0.0):
+        """bulk 저장: 거리 솎기 + (eps > 0 이면) Douglas-Peucker 후 cap 적용"""
+        xy = decimate_distance(np.asarray(xy, dtype=np.float64).reshape(-1, 2), self.min_step)
+        if eps > 0:
+            xy = simplify_dp(xy, eps)
+        n = len(xy)
+        if n > len(self._buf):
+            self._buf = np.empty((max(n, 2 * len(self._buf)), 2), dtype=np.float64)
+        self._buf[:n] = xy
+        self._n = n
+        if n > self.max_points:
+            self.compact()
+
+    def compact(self):
+        """cap 초과 시 오차를 키워 가며 DP 로 줄인다 (목표: cap 의 3/4). 그래도 넘치면 오래된 점부터 버림"""
+        target = self.max_points * 3 // 4
+        pts = self.points()
+        eps = max(self.min_step, 1.0)
+        for _ in range(8):
+            if len(pts) <= target:
+                break
+            pts = simplify_dp(pts, eps)
+            eps *= 2.0
+        if len(pts) > target:
+            pts = pts[-target:]
+        n = len(pts)
+        self._buf[:n] = pts
+        self._n = n
+        self.compactions += 1
+
+
+class ChunkedTrajectory:
+    def __init__(self, scene, pen, z=99, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.scene = scene
+        self.pen = pen
+        self.z = z
+        self.chunk_size = max(2, int(chunk_size))
+
+        self._sealed = []          # 봉인된 QGraphicsPathItem
+        self._sealed_rect = QRectF()
+        self._live_item = None
+        self._live_path = None
+        self._live_count = 0
+        self._last = None          # 마지막 점 (QPointF)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def last_point(self):
+        return self._last
+
+    def _new_item(self):
+        item = QGraphicsPathItem()
+        item.setPen(self.pen)
+        item.setZValue(self.z)
+        self.scene.addItem(item)
+        return item
+
+    def _start_chunk(self, start):
+        self._live_item = self._new_item()
+        self._live_path = QPainterPath(start)
+        self._live_count = 1
+
+    def _seal(self):
+        self._sealed.append(self._live_item)
+        self._sealed_rect = self._sealed_rect.united(self._live_item.boundingRect())
+        # 다음 chunk 는 이 chunk 의 마지막 점에서 이어서 시작
+        self._start_chunk(self._last)
+
+    def append(self, pt):
+        """점 1개 추가 (비용: live chunk 크기에만 비례)"""
+        pt = QPointF(pt)
+        if self._live_item is None:
+            self._start_chunk(pt)
+        else:
+            self._live_path.lineTo(pt)
+            self._live_count += 1
+        self._live_item.setPath(self._live_path)
+        self._last = pt
+        self._count += 1
+        if self._live_count >= self.chunk_size:
+            self._seal()
+
+    def extend(self, points):
+        for pt in points:
+            self.append(pt)
+
+    def set_points(self, xy):
+        """(N,2) scene 좌표 배열로 궤적 전체를 다시 만든다 (점별 append 없음)"""
+        self.clear()
+        n = len(xy)
+        if n == 0:
+            return
+        pts = [QPointF(float(x), float(y)) for x, y in xy]
+        step = self.chunk_size - 1     # 인접 chunk 는 경계 점 1개를 공유
+        start = 0
+        while True:
+            end = min(start + self.chunk_size, n)
+            path = QPainterPath()
+            path.addPolygon(QPolygonF(pts[start:end]))
+            item = self._new_item()
+            item.setPath(path)
+            if end - start >= self.chunk_size and end < n:
+                self._sealed.append(item)
+                self._sealed_rect = self._sealed_rect.united(item.boundingRect())
+                start += step
+                continue
+            # 마지막 chunk 는 live 로 남겨서 이후 append 가 이어 붙도록
+            self._live_item = item
+            self._live_path = path
+            self._live_count = end - start
+            break
+        self._last = pts[-1]
+        self._count = n
+        if self._live_count >= self.chunk_size:
+            self._seal()
+
+    def clear(self):
+        for item in self._sealed:
+            self.scene.removeItem(item)
+        if self._live_item is not None:
+            self.scene.removeItem(self._live_item)
+        self._sealed = []
+        self._sealed_rect = QRectF()
+        self._live_item = None
+        self._live_path = None
+        self._live_count = 0
+        self._last = None
+        self._count = 0
+
+    def bounding_rect(self):
+        """전체 궤적 bounding rect (scene 좌표, pen 두께 포함)"""
+        rect = QRectF(self._sealed_rect)
+        if self._live_item is not None:
+            rect = rect.united(self._live_item.boundingRect())
+        return rect
+
+    def set_pen(self, pen):
+        self.pen = pen
+        for item in self._sealed:
+            item.setPen(pen)
+        if self._live_item is not None:
+            self._live_item.setPen(pen)
@@ -0,0 +1,159 @@
+# utils/pose_interp.py
+"""불규칙하게 들어오는 pose 를 고정 화면 주기로 보간/외삽하는 모델.
+
+pose 는 Firestore events (events_pose_emit_interval_s 로 throttle), robots snapshot,
+MQTT pose 로 들쭉날쭉하게 들어와서 그대로 setPos 하면 로봇 아이콘이 점프한다.
+PoseInterpolator 는 시각이 붙은 pose 샘플을 모아 두고
+  - 표시 시각 = now - delay 에서 앞뒤 샘플 사이를 선형 보간 (yaw 는 최단 각도로)
+  - 표시 시각이 마지막 샘플을 지나면 마지막 구간 속도로 max_extrap_s 까지만 외삽하고,
+    그래도 다음 샘플이 없으면 마지막 샘플 위치로 되돌아와 정지 (멈춘 로봇이 앞에 떠 있지 않게)
+  - coalesce_s 안에 몰려 들어온 샘플(burst)은 마지막 샘플을 덮어써서 1개로 합침
+  - 샘플 간격이 max_gap_s 보다 길면 (통신 끊김) 보간하지 않고 다음 샘플로 바로 이동
+한다. delay 를 upstream emit 주기 정도로 두면 화면은 그만큼 늦지만 항상 두 샘플 사이를 보간하게 된다.
+
+샘플 시각(source ts, epoch 초)은 로봇/서버 시계라 로컬 monotonic 과 다르다.
+offset = 도착 시각 - source ts 중 작은 값(가장 지연이 적었던 샘플)을 따라가고, 커지는 쪽으로는 천천히 따라가서
+시계 차이/드리프트를 흡수한다. ts 가 없는 샘플은 도착 시각을 그대로 쓴다.
+소스마다 지연이 달라 샘플이 시각 순서대로 오지 않으므로, 아직 표시되지 않은 시각(> now - delay)의
+샘플은 시각 순서 자리에 끼워 넣고 이미 지나간 시각의 샘플만 버린다.
+여러 소스를 섞을 때는 모두 같은 시간축(source epoch)으로 넘겨야 한다 (MapPage 는 ts 없는 소스를 도착 epoch 로 찍음).
+"""
+from bisect import bisect_left
+import math
+import time
+
+
+def _wrap(a):
+    return (a + math.pi) % (2.0 * math.pi) - math.pi
+
+
+class PoseInterpolator:
+    def __init__(self, delay_s=1.0, max_extrap_s=0.5, max_gap_s=5.0, coalesce_s=0.05, history=32):
+        self.delay_s = max(0.0, float(delay_s))
+        self.max_extrap_s = max(0.0, float(max_extrap_s))
+        self.max_gap_s = float(max_gap_s)
+        self.coalesce_s = float(coalesce_s)
+
+        self.history = max(2, int(history))
+        self._samples = []         # (t_local, x, y, yaw), 시각 오름차순
+        self._offset = None
+        self.coalesced = 0
+        self.dropped = 0          # 이미 표시 시각이 지나서 버린 샘플
+        self.reordered = 0        # 늦게 와서 중간에 끼워 넣은 샘플
+
+    @classmethod
+    def from_cfg(cls, cfg):
+        return cls(
+            delay_s=getattr(cfg, "map_anim_delay_s", 1.0),
+            max_extrap_s=getattr(cfg, "map_anim_max_extrap_s", 0.5),
+            max_gap_s=getattr(cfg, "map_anim_max_gap_s", 5.0),
+            coalesce_s=getattr(cfg, "map_anim_coalesce_s", 0.05),
+        )
+
+    def __len__(self):
+        return len(self._samples)
+
+    def reset(self):
+        self._samples.clear()
+        self._offset = None
+
+    def _to_local(self, ts, now):
+        """source ts (epoch 초) -> 로컬 monotonic 시각"""
+        if ts is None:
+            return now
+        o = now - ts
+        if self._offset is None or o < self._offset:
+            self._offset = o
+        else:
+            self._offset += (o - self._offset) * 0.05
+        return ts + self._offset
+
+    def push(self, x, y, yaw=0.0, ts=None, now=None):
+        """pose 샘플 추가. 버려진 샘플이면 False"""
+        now = time.monotonic() if now is None else now
+        t = self._to_local(ts, now)
+        s = (t, float(x), float(y), float(yaw or 0.0))
+        if self._samples:
+            last_t = self._samples[-1][0]
+            if t < last_t:
+                return self._insert(s, now)
+            if t - last_t > self.max_gap_s:
+                self._samples.clear()       # 오래 끊겼다가 다시 옴 -> 보간 없이 새로 시작
+            elif t - last_t < self.coalesce_s:
+                self._samples[-1] = s
+                self.coalesced += 1
+                return True
+        self._samples.append(s)
+        if len(self._samples) > self.history:
+            del self._samples[0]
+        return True
+
+    def _insert(self, s, now):
+        """늦게 도착한 (마지막 샘플보다 이른) 샘플: 아직 표시 전이면 시각 순서 자리에 넣음"""
+        t = s[0]
+        if t <= now - self.delay_s:
+            self.dropped += 1
+            return False
+        samples = self._samples
+        i = bisect_left(samples, t, key=lambda v: v[0])
+        for j in (i - 1, i):
+            if 0 <= j < len(samples) and abs(samples[j][0] - t) < self.coalesce_s:
+                samples[j] = s
+                self.coalesced += 1
+                return True
+        samples.insert(i, s)
+        self.reordered += 1
+        if len(samples) > self.history:
+            del samples[0]
+        return True
+
+    def snap(self, x, y, yaw=0.0, now=None):
+        """보간 없이 현재 위치로 고정 (bulk load 직후 등)"""
+        now = time.monotonic() if now is None else now
+        self._samples.clear()
+        self._samples.append((now - self.delay_s, float(x), float(y), float(yaw or 0.0)))
+
+    def pose_at(self, now=None):
+        """-> (x, y, yaw, settled). settled 면 더 움직일 일이 없음 (애니메이션 정지 가능)"""
+        now = time.monotonic() if now is None else now
+        if not self._samples:
+            return None
+        td = now - self.delay_s
+        samples = self._samples
+
+        first = samples[0]
+        if td <= first[0]:
+            return first[1], first[2], first[3], len(samples) == 1
+
+        last = samples[-1]
+        if td >= last[0]:
+            if len(samples) < 2:
+                return last[1], last[2], last[3], True
+            prev = samples[-2]
+            dt = last[0] - prev[0]
+            if dt <= 0 or dt > self.max_gap_s:
+                return last[1], last[2], last[3], True
+            # max_extrap_s 동안 외삽, 그래도 안 오면 같은 시간 동안 마지막 샘플로 되돌아와서 정지
+            late = td - last[0]
+            if late >= 2.0 * self.max_extrap_s:
+                return last[1], last[2], last[3], True
+            k = min(late, 2.0 * self.max_extrap_s - late) / dt
+            return (last[1] + (last[1] - prev[1]) * k,
+                    last[2] + (last[2] - prev[2]) * k,
+                    _wrap(last[3] + _wrap(last[3] - prev[3]) * k),
+                    False)
+
+        # 뒤에서부터 td 를 감싸는 구간 찾기 (샘플 수가 작음)
+        for i in range(len(samples) - 1, 0, -1):
+            a = samples[i - 1]
+            if a[0] <= td:
+                b = samples[i]
+                break
+        dt = b[0] - a[0]
+        if dt <= 0 or dt > self.max_gap_s:
+            return a[1], a[2], a[3], False
+        k = (td - a[0]) / dt
+        return (a[1] + (b[1] - a[1]) * k,
+                a[2] + (b[2] - a[2]) * k,
+                _wrap(a[3] + _wrap(b[3] - a[3]) * k),
+                False)
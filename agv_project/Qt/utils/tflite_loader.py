@@ -0,0 +1,125 @@
+# utils/tflite_loader.py
+"""TFLite Interpreter 생성 + (선택) 시작 시 self-benchmark.
+
+기본 Interpreter(model_path=...) 는 단일 스레드라 4코어 RPi 에서 코어 1개만 쓴다.
+여기서는 cfg 로
+  - yolo_num_threads : interpreter 스레드 수
+  - yolo_delegate    : "default" | "xnnpack" | "none" | "auto"
+      default : 런타임 기본 (빌드에 따라 XNNPACK 이 기본 적용됨)
+      xnnpack : XNNPACK delegate 를 명시적으로 load (yolo_xnnpack_lib 경로 필요할 수 있음)
+      none    : 기본 delegate 끄기 (비교용)
+      auto    : default / xnnpack 후보를 벤치마크
+  - yolo_autotune    : 후보 (스레드 수 x delegate) 를 벤치마크해서 가장 빠른 설정 선택
+를 고를 수 있게 한다.
+"""
+import time
+
+import numpy as np
+
+try:
+    from tflite_runtime.interpreter import Interpreter, load_delegate
+except ImportError:
+    from tensorflow.lite.python.interpreter import Interpreter, load_delegate
+
+try:
+    try:
+        from tflite_runtime.interpreter import OpResolverType
+    except ImportError:
+        from tensorflow.lite.python.interpreter import OpResolverType
+except ImportError:  # 오래된 런타임
+    OpResolverType = None
+
+DELEGATES = ("default", "xnnpack", "none")
+# "auto" 일 때 비교할 후보 ("none" 은 비교용이라 명시했을 때만)
+AUTO_DELEGATES = ("default", "xnnpack")
+
+# 명시적 XNNPACK delegate 라이브러리 기본 이름 (배포판마다 다름)
+_XNNPACK_LIBS = (
+    "libtensorflowlite_delegate_xnnpack.so",
+    "libxnnpack_delegate.so",
+)
+
+
+def make_interpreter(model_path, num_threads=None, delegate="default", xnnpack_lib=""):
+    """Interpreter 생성 + allocate_tensors. 실패 시 예외를 그대로 올린다."""
+    kwargs = {"model_path": model_path}
+    if num_threads:
+        kwargs["num_threads"] = int(num_threads)
+
+    if delegate == "xnnpack":
+        opts = {"num_threads": int(num_threads)} if num_threads else {}
+        last_err = None
+        for lib in ([xnnpack_lib] if xnnpack_lib else []) + list(_XNNPACK_LIBS):
+            try:
+                kwargs["experimental_delegates"] = [load_delegate(lib, opts)]
+                break
+            except (ValueError, OSError) as e:
+                last_err = e
+        else:
+            raise RuntimeError(f"XNNPACK delegate load failed: {last_err}")
+    elif delegate == "none":
+        if OpResolverType is None:
+            raise RuntimeError("runtime does not support disabling default delegates")
+        kwargs["experimental_op_resolver_type"] = OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+
+    interpreter = Interpreter(**kwargs)
+    interpreter.allocate_tensors()
+    return interpreter
+
+
+def bench_invoke(interpreter, runs=5, warmup=1):
+    """0 입력으로 invoke latency 측정 -> median ms."""
+    d = interpreter.get_input_details()[0]
+    interpreter.set_tensor(d["index"], np.zeros(d["shape"], dtype=d["dtype"]))
+    for _ in range(warmup):
+        interpreter.invoke()
+    samples = []
+    for _ in range(max(1, runs)):
+        t0 = time.perf_counter()
+        interpreter.invoke()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return float(np.median(samples))
+
+
+def _candidates(cfg):
+    n = int(getattr(cfg, "yolo_num_threads", 4) or 1)
+    delegate = getattr(cfg, "yolo_delegate", "default")
+
+    if not getattr(cfg, "yolo_autotune", False):
+        return [(n, "default" if delegate == "auto" else delegate)]
+
+    threads = sorted({1, max(1, n // 2), n})
+    delegates = list(AUTO_DELEGATES) if delegate == "auto" else [delegate]
+    return [(t, d) for d in delegates for t in threads]
+
+
+def build_interpreter(cfg, model_path=None, log=print):
+    """cfg 설정으로 Interpreter 를 만든다. autotune 이면 가장 빠른 후보를 고른다.
+
+    반환: (interpreter, num_threads, delegate, latency_ms or None)
+    """
+    model_path = model_path or cfg.yolo_model_path
+    xnnpack_lib = getattr(cfg, "yolo_xnnpack_lib", "")
+    runs = int(getattr(cfg, "yolo_autotune_runs", 5))
+    cands = _candidates(cfg)
+
+    if len(cands) == 1:
+        n, d = cands[0]
+        return make_interpreter(model_path, n, d, xnnpack_lib), n, d, None
+
+    best = None
+    for n, d in cands:
+        try:
+            itp = make_interpreter(model_path, n, d, xnnpack_lib)
+            ms = bench_invoke(itp, runs=runs)
+        except Exception as e:
+            log(f"[TFLite] bench threads={n} delegate={d}: skip ({e})")
+            continue
+        log(f"[TFLite] bench threads={n} delegate={d}: {ms:.1f} ms/invoke")
+        if best is None or ms < best[3]:
+            best = (itp, n, d, ms)
+
+    if best is None:
+        raise RuntimeError("no usable TFLite interpreter configuration")
+    log(f"[TFLite] selected threads={best[1]} delegate={best[2]} ({best[3]:.1f} ms)")
+    return best
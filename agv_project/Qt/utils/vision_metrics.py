@@ -0,0 +1,137 @@
+# utils/vision_metrics.py
+"""비전 파이프라인 단계별 계측 (저오버헤드 rolling histogram).
+
+CameraWorker.status 는 자유 문자열뿐이라 어디서 시간이 드는지 알 수 없었다.
+VisionMetrics 는 grabber / inference / render / GUI 스레드에서 공통으로 쓰는 집계기로
+  - 단계별 시간: capture(cap.read 대기), preprocess, invoke, decode, nms, track, convert(FrameRing 기록), draw(paint)
+  - 카운터: captured / inferred / gated(motion gate 로 생략) / rendered / painted 프레임 수,
+            dropped_infer / dropped_render, detections
+를 모으고, snapshot() 으로 1 구간(보통 1초) 요약을 만든 뒤 구간을 비운다.
+
+히스토그램은 고정 로그 간격 bucket 에 개수만 더하므로 (bisect + list 증가)
+샘플 저장/정렬이 없고 add() 1회 비용이 ~1us 수준이다. 백분위는 bucket 상한값으로 근사한다 (24 bucket/decade, 오차 ~10%).
+"""
+from bisect import bisect_left
+import threading
+import time
+
+STAGES = ("capture", "preprocess", "invoke", "decode", "nms", "track", "convert", "draw")
+COUNTERS = ("captured", "inferred", "gated", "rendered", "painted", "dropped_infer", "dropped_render", "detections")
+
+
+def _log_edges(lo_ms=0.05, hi_ms=5000.0, per_decade=24):
+    edges = []
+    v = lo_ms
+    step = 10.0 ** (1.0 / per_decade)
+    while v < hi_ms:
+        edges.append(v)
+        v *= step
+    edges.append(hi_ms)
+    return tuple(edges)
+
+
+BUCKET_EDGES_MS = _log_edges()
+
+
+class RollingHistogram:
+    """ms 단위 값의 bucket 히스토그램 (구간마다 reset)."""
+    __slots__ = ("counts", "n", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_EDGES_MS) + 1)
+        self.n = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        self.counts[bisect_left(BUCKET_EDGES_MS, ms)] += 1
+        self.n += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, q):
+        if self.n == 0:
+            return 0.0
+        target = q * self.n
+        acc = 0
+        for i, c in enumerate(self.counts):
+            acc += c
+            if acc >= target:
+                return min(BUCKET_EDGES_MS[i], self.max) if i < len(BUCKET_EDGES_MS) else self.max
+        return self.max
+
+    def summary(self):
+        return {
+            "n": self.n,
+            "mean": self.total / self.n if self.n else 0.0,
+            "p50": self.percentile(0.50),
+            "p90": self.percentile(0.90),
+            "p99": self.percentile(0.99),
+            "max": self.max,
+        }
+
+
+class VisionMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._hists = {s: RollingHistogram() for s in STAGES}
+        self._counts = dict.fromkeys(COUNTERS, 0)
+        self._t0 = time.monotonic()
+
+    def add(self, stage, seconds):
+        """단계 시간 기록 (초 단위로 받아 ms 로 저장)"""
+        with self._lock:
+            self._hists[stage].add(seconds * 1000.0)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self._counts[name] += n
+
+    def snapshot(self, reset=True):
+        """지난 snapshot 이후 구간 요약 dict"""
+        with self._lock:
+            now = time.monotonic()
+            dt = max(now - self._t0, 1e-6)
+            hists, counts = self._hists, self._counts
+            if reset:
+                self._reset()
+        c = counts
+        return {
+            "window_s": dt,
+            "fps": {
+                "capture": c["captured"] / dt,
+                "infer": c["inferred"] / dt,
+                "render": c["rendered"] / dt,
+                "paint": c["painted"] / dt,
+            },
+            "stages_ms": {s: h.summary() for s, h in hists.items() if h.n},
+            "dropped": {"infer": c["dropped_infer"], "render": c["dropped_render"]},
+            "gated": c["gated"],
+            "dets_per_frame": c["detections"] / c["inferred"] if c["inferred"] else 0.0,
+        }
+
+
+def format_overlay(snap, display_latency_ms=None):
+    """snapshot -> 화면 overlay 용 짧은 문자열 줄 목록"""
+    fps = snap["fps"]
+    st = snap["stages_ms"]
+    lines = [f"cam {fps['capture']:.1f}  infer {fps['infer']:.1f}  view {fps['paint']:.1f} fps"]
+
+    infer_ms = [f"{name} {st[name]['p50']:.1f}" for name in ("preprocess", "invoke", "decode", "nms") if name in st]
+    if infer_ms:
+        lines.append("p50 ms: " + "  ".join(infer_ms))
+    tail = []
+    if "invoke" in st:
+        tail.append(f"invoke p90 {st['invoke']['p90']:.1f}")
+    if display_latency_ms is not None:
+        tail.append(f"cap->view {display_latency_ms:.0f} ms")
+    tail.append(f"drop {snap['dropped']['infer']}/{snap['dropped']['render']}")
+    if snap.get("gated"):
+        tail.append(f"idle {snap['gated']}")
+    tail.append(f"det {snap['dets_per_frame']:.1f}")
+    lines.append("  ".join(tail))
+    return lines
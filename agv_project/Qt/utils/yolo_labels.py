@@ -1,4 +1,6 @@
 # utils/yolo_labels.py
+import os
+
 import yaml
 
 def load_labels_from_data_yaml(path: str):
@@ -34,3 +36,23 @@ def load_labels_from_data_yaml(path: str):
         colors = {int(k): tuple(v) for k, v in raw_colors.items()}
 
     return labels, colors
+
+
+def apply_data_yaml(cfg):
+    """cfg.yolo_labels / yolo_colors 가 비어 있으면 cfg.yolo_data_yaml 에서 채운다 (시작 시 1번).
+
+    config 에 직접 적은 값이 있으면 그대로 둔다. 파일이 없으면 아무것도 안 함 (cls0, cls1 로 표시).
+    반환: data.yaml 에서 하나라도 채웠으면 True
+    """
+    path = getattr(cfg, "yolo_data_yaml", "")
+    if not path or not os.path.isfile(path):
+        return False
+    labels, colors = load_labels_from_data_yaml(path)
+    applied = False
+    if getattr(cfg, "yolo_labels", None) is None and labels:
+        cfg.yolo_labels = list(labels)
+        applied = True
+    if getattr(cfg, "yolo_colors", None) is None and colors:
+        cfg.yolo_colors = colors
+        applied = True
+    return applied
@@ -0,0 +1,113 @@
+# utils/yolo_nms.py
+"""(N, 6) 검출 배열 전용 NMS 엔진.
+
+입력/출력 모두 (N, 6) float32 배열 [x1, y1, x2, y2, score, cls_id] 이다.
+(list <-> ndarray 왕복 없음)
+
+- per-class NMS 는 클래스별 루프 대신 "좌표 오프셋 트릭"으로 한 번에 처리:
+  클래스마다 박스를 서로 겹치지 않는 위치로 평행이동시킨 뒤 class-agnostic NMS 를 1회 수행.
+- top_k: NMS 전에 score 상위 k 개만 남겨서 박스가 많은 프레임에서도 O(k^2) 로 제한.
+- backend="cv2": cv2.dnn.NMSBoxes 사용 (사용 불가 시 numpy 로 fallback)
+"""
+import numpy as np
+
+from utils.yolo_decode import EMPTY_DETS
+
+try:
+    import cv2
+    _HAS_CV2_NMS = hasattr(cv2, "dnn") and hasattr(cv2.dnn, "NMSBoxes")
+except ImportError:  # pragma: no cover - cv2 는 requirements 에 포함
+    cv2 = None
+    _HAS_CV2_NMS = False
+
+NMS_BACKENDS = ("numpy", "cv2")
+
+
+def _nms_indices_numpy(boxes, scores, iou_thres):
+    """greedy NMS, 살아남은 인덱스(score 내림차순)를 반환."""
+    x1 = boxes[:, 0]
+    y1 = boxes[:, 1]
+    x2 = boxes[:, 2]
+    y2 = boxes[:, 3]
+    areas = np.maximum(0.0, x2 - x1) * np.maximum(0.0, y2 - y1)
+
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        if order.size == 1:
+            break
+        rest = order[1:]
+        inter_w = np.maximum(0.0, np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]))
+        inter_h = np.maximum(0.0, np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]))
+        inter = inter_w * inter_h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_thres]
+    return np.asarray(keep, dtype=np.intp)
+
+
+def _nms_indices_cv2(boxes, scores, iou_thres):
+    # cv2.dnn.NMSBoxes 는 [x, y, w, h] 형식을 받는다
+    xywh = boxes.copy()
+    xywh[:, 2:4] -= xywh[:, 0:2]
+    idx = cv2.dnn.NMSBoxes(xywh.tolist(), scores.tolist(), 0.0, float(iou_thres))
+    # OpenCV 버전에 따라 (k,1) / (k,) / () 로 반환됨
+    return np.asarray(idx, dtype=np.intp).reshape(-1)
+
+
+def nms(dets, iou_thres=0.45, agnostic=False, top_k=None, max_det=None, backend="numpy"):
+    """(N,6) 배열에 대한 NMS.
+
+    agnostic=False 이면 좌표 오프셋 트릭으로 per-class NMS 를 한 번에 수행한다.
+    """
+    dets = np.asarray(dets, dtype=np.float32)
+    if dets.ndim != 2 or dets.shape[0] == 0:
+        return EMPTY_DETS
+
+    # top-k pre-filter (argpartition: O(N))
+    if top_k and dets.shape[0] > top_k:
+        part = np.argpartition(dets[:, 4], -top_k)[-top_k:]
+        dets = dets[part]
+
+    boxes = dets[:, :4]
+    scores = dets[:, 4]
+    if not agnostic:
+        # 클래스마다 (좌표 범위 + 1) 만큼 떨어뜨리면 다른 클래스끼리는 IoU=0
+        span = float(boxes.max() - min(float(boxes.min()), 0.0)) + 1.0
+        boxes = boxes + dets[:, 5:6] * span
+
+    if backend == "cv2" and _HAS_CV2_NMS:
+        keep = _nms_indices_cv2(boxes, scores, iou_thres)
+    else:
+        keep = _nms_indices_numpy(boxes, scores, iou_thres)
+
+    if max_det and keep.size > max_det:
+        keep = keep[:max_det]
+    return dets[keep]
+
+
+def nms_xyxy(dets, iou_thres=0.45, **kwargs):
+    """class-agnostic NMS"""
+    return nms(dets, iou_thres=iou_thres, agnostic=True, **kwargs)
+
+
+def nms_xyxy_per_class(dets, iou_thres=0.45, **kwargs):
+    """per-class NMS"""
+    return nms(dets, iou_thres=iou_thres, agnostic=False, **kwargs)
+
+
+def nms_from_cfg(dets, cfg):
+    """AppConfig 의 yolo_nms_* 값으로 NMS 수행 (워커 공용)."""
+    # IoU threshold: yolo_nms_iou 우선, 없으면 yolo_iou_thres fallback
+    iou = getattr(cfg, "yolo_nms_iou", None)
+    if iou is None:
+        iou = getattr(cfg, "yolo_iou_thres", 0.45)
+    return nms(
+        dets,
+        iou_thres=float(iou),
+        agnostic=bool(getattr(cfg, "yolo_nms_agnostic", False)),
+        top_k=getattr(cfg, "yolo_nms_topk", None),
+        max_det=getattr(cfg, "yolo_max_det", None),
+        backend=getattr(cfg, "yolo_nms_backend", "numpy"),
+    )
@@ -0,0 +1,177 @@
+# utils/yolo_preprocess.py
+"""YOLO 입력 전처리 (preallocated buffer, zero per-frame allocation).
+
+기존 preprocess 는 매 프레임
+  resize 결과 -> cvtColor 사본 -> float32 사본 -> expand_dims -> set_tensor 복사
+로 4~5 번 할당/복사가 일어났다.
+
+InputPreprocessor 는
+  1) 고정 크기 uint8 버퍼로 cv2.resize(dst=...)
+  2) BGR->RGB 채널 뒤집기 + 1/255 정규화를 np.multiply(out=...) 한 번으로
+     interpreter 입력 텐서(interpreter.tensor() view)에 직접 기록
+하므로 set_tensor 복사도 없다.
+
+양자화(int8/uint8 입력) 모델은 float 변환 없이 픽셀을 그대로(또는 zero_point 만 더해서) 넣는다.
+  real = (q - zp) * scale,  real = pixel / 255
+  -> q = pixel * (1 / (255 * scale)) + zp
+  YOLOv5 int8 export 는 보통 scale = 1/255 이므로 q = pixel + zp (uint8: zp=0, int8: zp=-128)
+
+resize 방식 (mode)
+  - "stretch"  : 입력 크기로 그냥 늘림 (640x480 -> 정사각형, 비율 왜곡)
+  - "letterbox": 비율 유지 resize + 회색(114) 패딩 (YOLOv5 학습/detect.py 와 동일)
+  패딩/스케일 값은 프레임 크기별로 캐시하고, unmap(dets) 으로 입력 좌표 -> 프레임 좌표로 되돌린다.
+
+ROI (infer_rois)
+  주행 경로(화면 하단 중앙)만 보면 되는 경우 cfg.yolo_rois 로 잘라낸 영역만 추론하고
+  결과를 전체 프레임 좌표로 되돌린다. 같은 입력 크기에 더 작은 영역이 들어가므로 작은 물체 검출도 유리하다.
+
+주의: tensor() view 는 invoke() 중에 들고 있으면 안 되므로 매 프레임 새로 얻고 바로 버린다.
+"""
+import cv2
+import numpy as np
+
+PREPROCESS_MODES = ("stretch", "letterbox")
+LETTERBOX_PAD = 114
+
+
+class _Geometry:
+    """프레임 크기 1개에 대한 resize/패딩 파라미터 (캐시용)."""
+    __slots__ = ("frame_w", "frame_h", "new_w", "new_h", "left", "top", "sx", "sy", "buf")
+
+    def __init__(self, frame_w, frame_h, in_w, in_h, letterbox):
+        self.frame_w = frame_w
+        self.frame_h = frame_h
+        if letterbox:
+            r = min(in_w / frame_w, in_h / frame_h)
+            self.new_w = int(round(frame_w * r))
+            self.new_h = int(round(frame_h * r))
+            self.left = (in_w - self.new_w) // 2
+            self.top = (in_h - self.new_h) // 2
+            self.buf = np.empty((self.new_h, self.new_w, 3), dtype=np.uint8)
+        else:
+            self.new_w, self.new_h = in_w, in_h
+            self.left = self.top = 0
+            self.buf = None
+        # 입력 픽셀 좌표 -> 프레임 좌표 배율
+        self.sx = frame_w / self.new_w
+        self.sy = frame_h / self.new_h
+
+
+class InputPreprocessor:
+    def __init__(self, interpreter, input_detail, mode="stretch"):
+        self.interpreter = interpreter
+        self.index = input_detail["index"]
+        _, self.in_h, self.in_w, _ = input_detail["shape"]
+        self.dtype = input_detail["dtype"]
+        self.float_input = (self.dtype == np.float32)
+
+        # 양자화 입력: q = pixel * q_gain + q_zp
+        self.q_gain = 1.0
+        self.q_zp = 0
+        self._qbuf = None
+        if not self.float_input:
+            scale, zp = input_detail.get("quantization", (0.0, 0))
+            if scale:
+                self.q_gain = 1.0 / (255.0 * float(scale))
+                self.q_zp = int(zp)
+            # gain 이 1 이 아니면 (드묾) float 중간 버퍼가 필요
+            if abs(self.q_gain - 1.0) > 1e-3:
+                self._qbuf = np.empty((self.in_h, self.in_w, 3), dtype=np.float32)
+
+        # interpreter.tensor(idx) 는 "view 를 돌려주는 함수" 를 반환
+        self._tensor = interpreter.tensor(self.index)
+        self._resized = np.empty((self.in_h, self.in_w, 3), dtype=np.uint8)
+
+        self.letterbox = (mode == "letterbox")
+        self._geoms = {}      # (frame_h, frame_w) -> _Geometry
+        self.geom = None      # 마지막 프레임의 geometry (unmap 에서 사용)
+
+    def _geometry(self, frame):
+        fh, fw = frame.shape[:2]
+        g = self._geoms.get((fh, fw))
+        if g is None:
+            g = _Geometry(fw, fh, self.in_w, self.in_h, self.letterbox)
+            self._geoms[(fh, fw)] = g
+        if g is not self.geom and self.letterbox:
+            # 패딩 영역은 geometry 가 바뀔 때만 다시 채움
+            self._resized.fill(LETTERBOX_PAD)
+        self.geom = g
+        return g
+
+    def __call__(self, frame):
+        """frame(BGR uint8) -> interpreter 입력 텐서에 직접 기록."""
+        g = self._geometry(frame)
+        if g.buf is None:
+            cv2.resize(frame, (self.in_w, self.in_h), dst=self._resized, interpolation=cv2.INTER_LINEAR)
+        else:
+            cv2.resize(frame, (g.new_w, g.new_h), dst=g.buf, interpolation=cv2.INTER_LINEAR)
+            self._resized[g.top:g.top + g.new_h, g.left:g.left + g.new_w] = g.buf
+        rgb = self._resized[..., ::-1]   # BGR -> RGB view (복사 없음)
+
+        inp = self._tensor()[0]
+        if self.float_input:
+            np.multiply(rgb, np.float32(1.0 / 255.0), out=inp, casting="unsafe")
+        elif self._qbuf is not None:
+            info = np.iinfo(self.dtype)
+            np.multiply(rgb, np.float32(self.q_gain), out=self._qbuf)
+            self._qbuf += self.q_zp
+            np.rint(self._qbuf, out=self._qbuf)
+            np.clip(self._qbuf, info.min, info.max, out=self._qbuf)
+            np.copyto(inp, self._qbuf, casting="unsafe")
+        elif self.q_zp:
+            # int8 (zp=-128): int16 로 계산 후 int8 로 기록
+            np.add(rgb, self.q_zp, out=inp, dtype=np.int16, casting="unsafe")
+        else:
+            np.copyto(inp, rgb, casting="unsafe")
+        del inp
+
+    def unmap(self, dets):
+        """(N,6) dets 의 박스를 입력 픽셀 좌표 -> 마지막 프레임 좌표로 (in-place)."""
+        g = self.geom
+        if g is None or len(dets) == 0:
+            return dets
+        xs = dets[:, 0:4:2]   # x1, x2 (view)
+        ys = dets[:, 1:4:2]   # y1, y2 (view)
+        xs -= g.left
+        ys -= g.top
+        xs *= g.sx
+        ys *= g.sy
+        np.clip(xs, 0, g.frame_w - 1, out=xs)
+        np.clip(ys, 0, g.frame_h - 1, out=ys)
+        return dets
+
+
+def roi_rects(rois, frame_w, frame_h):
+    """정규화 ROI 목록 [(x, y, w, h), ...] (0~1) -> 픽셀 (x0, y0, x1, y1) 목록.
+
+    rois 가 비어 있으면 프레임 전체 1개를 돌려준다.
+    """
+    if not rois:
+        return [(0, 0, frame_w, frame_h)]
+    rects = []
+    for x, y, w, h in rois:
+        x0 = int(np.clip(x, 0.0, 1.0) * frame_w)
+        y0 = int(np.clip(y, 0.0, 1.0) * frame_h)
+        x1 = int(np.clip(x + w, 0.0, 1.0) * frame_w)
+        y1 = int(np.clip(y + h, 0.0, 1.0) * frame_h)
+        if x1 - x0 >= 8 and y1 - y0 >= 8:
+            rects.append((x0, y0, x1, y1))
+    return rects or [(0, 0, frame_w, frame_h)]
+
+
+def infer_rois(frame, rois, infer_fn):
+    """ROI 마다 infer_fn(crop) -> (N,6) 를 실행하고 프레임 좌표로 합친다.
+
+    crop 은 frame 의 view 라 복사가 없다 (cv2.resize 가 stride 를 처리).
+    """
+    H, W = frame.shape[:2]
+    parts = []
+    for x0, y0, x1, y1 in roi_rects(rois, W, H):
+        dets = infer_fn(frame[y0:y1, x0:x1])
+        if len(dets):
+            dets[:, 0:4:2] += x0
+            dets[:, 1:4:2] += y0
+            parts.append(dets)
+    if not parts:
+        return np.zeros((0, 6), dtype=np.float32)
+    return parts[0] if len(parts) == 1 else np.concatenate(parts)
@@ -6,74 +6,31 @@ import numpy as np
 from PySide6.QtCore import QThread, Signal
 from PySide6.QtGui import QImage, QPixmap
 
-try:
-    from tflite_runtime.interpreter import Interpreter
-except ImportError:
-    from tensorflow.lite.python.interpreter import Interpreter
-
-
-def _bbox_iou_xyxy(a, b):
-    ax1, ay1, ax2, ay2 = a
-    bx1, by1, bx2, by2 = b[..., 0], b[..., 1], b[..., 2], b[..., 3]
-
-    inter_x1 = np.maximum(ax1, bx1)
-    inter_y1 = np.maximum(ay1, by1)
-    inter_x2 = np.minimum(ax2, bx2)
-    inter_y2 = np.minimum(ay2, by2)
-
-    inter_w = np.maximum(0.0, inter_x2 - inter_x1)
-    inter_h = np.maximum(0.0, inter_y2 - inter_y1)
-    inter = inter_w * inter_h
-
-    area_a = np.maximum(0.0, ax2 - ax1) * np.maximum(0.0, ay2 - ay1)
-    area_b = np.maximum(0.0, bx2 - bx1) * np.maximum(0.0, by2 - by1)
-    return inter / (area_a + area_b - inter + 1e-9)
-
-
-def nms_xyxy(dets, iou_thres=0.45):
-    """class-agnostic NMS"""
-    if not dets:
-        return []
-    dets = np.asarray(dets, dtype=np.float32)
-    boxes = dets[:, :4]
-    scores = dets[:, 4]
-    order = scores.argsort()[::-1]
-    keep = []
-    while order.size > 0:
-        i = int(order[0])
-        keep.append(i)
-        if order.size == 1:
-            break
-        ious = _bbox_iou_xyxy(boxes[i], boxes[order[1:]])
-        inds = np.where(ious <= iou_thres)[0]
-        order = order[inds + 1]
-    return dets[keep].tolist()
-
-
-def nms_xyxy_per_class(dets, iou_thres=0.45):
-    """per-class NMS"""
-    if not dets:
-        return []
-    dets = np.asarray(dets, dtype=np.float32)
-    out = []
-    cls_ids = dets[:, 5].astype(np.int32)
-    for c in np.unique(cls_ids):
-        part = dets[cls_ids == c].tolist()
-        out.extend(nms_xyxy(part, iou_thres=iou_thres))
-    return out
+from utils.yolo_decode import (
+    decode_yolov5_raw, decode_nmsed, boxes_look_normalized, output_layout, output_quant,
+)
+from utils.yolo_nms import nms_from_cfg
+from utils.frame_source import open_capture
+from utils.infer_scheduler import InferenceScheduler
+from utils.tflite_loader import build_interpreter
+from utils.yolo_preprocess import InputPreprocessor, infer_rois
+from utils.yolo_tracker import SortTracker
 
 
 class YoloTFLiteWorker(QThread):
     frameReady = Signal(QPixmap)
+    detectionsReady = Signal(object)   # (N,6) float32, overlay 는 CameraView 가 그림
     status = Signal(str)
 
     def __init__(self, cfg, parent=None):
         super().__init__(parent)
         self.cfg = cfg
         self.running = False
+        self.interpreter = None
 
-        self.interpreter = Interpreter(model_path=cfg.yolo_model_path)
-        self.interpreter.allocate_tensors()
+    def load_model(self):
+        # num_threads / delegate / autotune 은 cfg 로 결정 (utils/tflite_loader.py)
+        self.interpreter, n, d, _ = build_interpreter(self.cfg, log=self.status.emit)
 
         self.input_detail = self.interpreter.get_input_details()[0]
         self.output_details = self.interpreter.get_output_details()
@@ -81,17 +38,30 @@ class YoloTFLiteWorker(QThread):
         in_shape = self.input_detail["shape"]
         _, self.in_h, self.in_w, _ = in_shape
         self.float_input = (self.input_detail["dtype"] == np.float32)
+        self.out_quant = output_quant(self.output_details[0])   # int8 모델이면 (scale, zp)
+        self._prep = InputPreprocessor(
+            self.interpreter, self.input_detail,
+            mode=getattr(self.cfg, "yolo_preprocess_mode", "stretch"),
+        )
+
+        # 출력 형식은 여기서 1번만 판정 (프레임마다 np.array + reshape 로 추정하지 않음)
+        self.out_layout = output_layout(self.output_details[0], getattr(self.cfg, "yolo_output_layout", "auto"))
+        self.nmsed_normalized = None   # NMS export 좌표가 0~1 인지 (첫 검출에서 판정)
 
-        self.status.emit(f"[TFLite] input={tuple(in_shape)} dtype={self.input_detail['dtype']}")
+        # warm-up (첫 invoke 의 초기화 비용을 카메라 루프 밖에서 소모)
+        self.interpreter.invoke()
+
+        self.status.emit(
+            f"[TFLite] input={tuple(in_shape)} dtype={self.input_detail['dtype']} "
+            f"output={self.out_layout} threads={n} delegate={d}"
+        )
 
     def stop(self):
         self.running = False
 
     def preprocess(self, frame):
-        img = cv2.resize(frame, (self.in_w, self.in_h))
-        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        img = img.astype(np.float32) / 255.0 if self.float_input else img
-        return np.expand_dims(img, axis=0)
+        # 입력 텐서에 직접 기록 (set_tensor 불필요)
+        self._prep(frame)
 
     def to_qpixmap(self, frame):
         rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
@@ -100,175 +70,105 @@ class YoloTFLiteWorker(QThread):
 
     def parse_out_as_raw(self, out, frame_w, frame_h):
         """
-        raw 형태 가정: [cx,cy,w,h,obj,cls...]
+        raw 형태 가정: [cx,cy,w,h,obj,cls...] (normalized 좌표)
+        -> (N,6) float32 [x1,y1,x2,y2,score,cls] (벡터화 디코더 사용)
         """
-        dets = []
-        arr = np.array(out)
-        if arr.ndim == 3 and arr.shape[0] == 1:
-            arr = arr[0]
-        if arr.ndim != 2:
-            arr = arr.reshape(-1, arr.shape[-1])
-
-        for row in arr:
-            obj = float(row[4])
-            if obj < self.cfg.yolo_conf_thres:
-                continue
-
-            cx, cy, ww, hh = row[:4].astype(np.float32)
-
-            # ✅ (수정1) 좌표 스케일 강제 통일: "항상 normalized"라고 가정하고 픽셀로 변환
-            cx *= frame_w
-            ww *= frame_w
-            cy *= frame_h
-            hh *= frame_h
-
-            x1 = cx - ww / 2.0
-            y1 = cy - hh / 2.0
-            x2 = cx + ww / 2.0
-            y2 = cy + hh / 2.0
-
-            cls_scores = row[5:]
-            cls_id = int(np.argmax(cls_scores)) if cls_scores.size else 0
-
-            # ✅ (수정2) score는 obj만 사용 (NMS가 확실히 먹게)
-            score = obj
-
-            dets.append([x1, y1, x2, y2, score, cls_id])
-
-        return dets
+        return decode_yolov5_raw(
+            out, frame_w, frame_h,
+            conf_thres=self.cfg.yolo_conf_thres,
+            score_mode=getattr(self.cfg, "yolo_score_mode", "obj_cls"),
+            quant=self.out_quant,
+        )
 
     def parse_out_as_nmsed(self, out, frame_w, frame_h):
         """
         (N,6) 형태 가정: [x1,y1,x2,y2,score,cls]
+        -> score 마스킹 후 (N,6) float32 (행 루프 없음)
         """
-        dets = []
-        arr = np.array(out)
-        if arr.ndim == 3 and arr.shape[0] == 1:
-            arr = arr[0]
-        if arr.ndim != 2:
-            arr = arr.reshape(-1, arr.shape[-1])
-
-        if arr.shape[1] != 6:
-            return []
-
-        xyxy = arr[:, :4].astype(np.float32)
-        score = arr[:, 4].astype(np.float32)
-        clsid = arr[:, 5].astype(np.float32)
-
-        # 0~1 좌표면 픽셀로
-        if float(np.max(xyxy)) <= 1.5:
-            xyxy[:, [0, 2]] *= frame_w
-            xyxy[:, [1, 3]] *= frame_h
-
-        for i in range(arr.shape[0]):
-            if float(score[i]) < self.cfg.yolo_conf_thres:
-                continue
-            dets.append([xyxy[i,0], xyxy[i,1], xyxy[i,2], xyxy[i,3], float(score[i]), int(clsid[i])])
-
+        norm = self.nmsed_normalized
+        dets = decode_nmsed(
+            out, frame_w, frame_h,
+            conf_thres=self.cfg.yolo_conf_thres,
+            quant=self.out_quant,
+            normalized=bool(norm),
+        )
+        if norm is None and len(dets):
+            # 0~1 좌표면 픽셀로 (판정은 1번만, 이후 프레임은 결과 재사용)
+            self.nmsed_normalized = boxes_look_normalized(dets)
+            if self.nmsed_normalized:
+                dets[:, 0:4:2] *= frame_w
+                dets[:, 1:4:2] *= frame_h
         return dets
 
-    def draw_boxes(self, frame, dets):
-        H, W = frame.shape[:2]
-        labels = getattr(self.cfg, "yolo_labels", None)
-        colors = getattr(self.cfg, "yolo_colors", None)
-
-        draw_boxes = bool(getattr(self.cfg, "yolo_draw_boxes", True))
-        draw_labels = bool(getattr(self.cfg, "yolo_draw_labels", True))
-
-        for x1, y1, x2, y2, score, cls_id in dets:
-            cid = int(cls_id)
-            x1 = int(np.clip(x1, 0, W - 1))
-            y1 = int(np.clip(y1, 0, H - 1))
-            x2 = int(np.clip(x2, 0, W - 1))
-            y2 = int(np.clip(y2, 0, H - 1))
-
-            color = (0, 255, 0)
-            if isinstance(colors, dict):
-                color = colors.get(cid, color)
+    def infer(self, frame):
+        """프레임 1장 추론 -> (N,6) dets (cfg.yolo_rois 가 있으면 ROI 만 추론)"""
+        dets = infer_rois(frame, getattr(self.cfg, "yolo_rois", None), self._infer_image)
 
-            if isinstance(labels, list) and 0 <= cid < len(labels):
-                name = labels[cid]
-            else:
-                name = f"cls{cid}"
+        # NMS (per-class / agnostic, top-k, backend 는 cfg 로 결정)
+        return nms_from_cfg(dets, self.cfg)
 
-            if draw_boxes:
-                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+    def _infer_image(self, img):
+        """이미지(프레임 또는 ROI crop) 1장 추론 -> img 좌표 (N,6) dets (NMS 전)"""
+        self.preprocess(img)
+        self.interpreter.invoke()
 
-            if draw_labels:
-                cv2.putText(
-                    frame,
-                    f"{name} {score:.2f}",
-                    (x1, max(0, y1 - 6)),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.6,
-                    color,
-                    2,
-                )
+        out0 = self.interpreter.get_tensor(self.output_details[0]["index"])
+        # 모델 입력 픽셀 좌표로 디코딩 후 img 좌표로 되돌림 (stretch / letterbox 공통)
+        dets = self.parse_outputs(out0, self.in_w, self.in_h)
+        return self._prep.unmap(dets)
 
-        return frame
+    def parse_outputs(self, out, frame_w, frame_h):
+        """load_model 에서 판정한 출력 형식으로 디코딩"""
+        if self.out_layout == "nmsed":
+            return self.parse_out_as_nmsed(out, frame_w, frame_h)
+        return self.parse_out_as_raw(out, frame_w, frame_h)
 
     def run(self):
-        cap = cv2.VideoCapture(self.cfg.camera_index)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.cfg.camera_width)
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.cfg.camera_height)
-
-        if not cap.isOpened():
+        if self.interpreter is None:
+            try:
+                self.load_model()
+            except Exception as e:
+                self.status.emit(f"[TFLite] model load failed: {e}")
+                return
+
+        # USB 카메라(camera_index), 없으면 녹화 영상(cam_file_path) 재생
+        cap, _ = open_capture(self.cfg, log=self.status.emit, sources=("v4l2", "file"))
+        if cap is None:
             self.status.emit("Camera open failed")
             return
 
         self.running = True
         self.status.emit("YOLO camera started")
 
-        # IoU threshold 가져오기: yolo_nms_iou 우선, 없으면 yolo_iou_thres fallback
-        nms_iou = getattr(self.cfg, "yolo_nms_iou", None)
-        if nms_iou is None:
-            nms_iou = getattr(self.cfg, "yolo_iou_thres", 0.45)
-
-        # agnostic 스위치 (없으면 False)
-        agnostic = bool(getattr(self.cfg, "yolo_nms_agnostic", False))
+        # 추론 주기 (stride / max_hz / adaptive). 건너뛴 프레임엔 마지막 검출 결과가 그대로 표시됨
+        scheduler = InferenceScheduler.from_cfg(self.cfg)
+        # tracker 가 있으면 건너뛴 프레임에도 예측 박스를 보냄
+        tracker = SortTracker.from_cfg(self.cfg) if getattr(self.cfg, "yolo_track", True) else None
+        frame_idx = 0
 
         while self.running:
             ret, frame = cap.read()
             if not ret or frame is None:
+                if getattr(cap, "ended", False):
+                    break
+                time.sleep(0.01)
                 continue
+            frame_idx += 1
+            t_grab = time.monotonic()
+
+            if scheduler.should_infer(frame_idx):
+                t0 = time.perf_counter()
+                dets = self.infer(frame)
+                scheduler.mark(frame_idx, time.perf_counter() - t0)
+                if tracker is not None:
+                    dets = tracker.update(dets, t_grab)
+                self.detectionsReady.emit(dets)
+            elif tracker is not None and len(tracker):
+                self.detectionsReady.emit(tracker.predict(t_grab))
 
-            inp = self.preprocess(frame)
-            self.interpreter.set_tensor(self.input_detail["index"], inp)
-            self.interpreter.invoke()
-
-            out0 = self.interpreter.get_tensor(self.output_details[0]["index"])
-            H, W = frame.shape[:2]
-
-            # 출력 포맷 추정
-            arr = np.array(out0)
-            if arr.ndim == 3 and arr.shape[0] == 1:
-                arr2 = arr[0]
-            else:
-                arr2 = arr.reshape(-1, arr.shape[-1])
-
-            D = arr2.shape[1]
-            if D == 6:
-                dets = self.parse_out_as_nmsed(arr2, W, H)
-            else:
-                dets = self.parse_out_as_raw(arr2, W, H)
-
-            # ✅ (수정3) NMS 적용 (여기 없어서 지금까지 “NMS 안 되는 것처럼” 보였던 거)
-            if dets:
-                # 디버그 보고 싶으면 주석 해제
-                # print(f"[DEBUG] before NMS: {len(dets)}")
-
-                if agnostic:
-                    dets = nms_xyxy(dets, iou_thres=nms_iou)
-                else:
-                    dets = nms_xyxy_per_class(dets, iou_thres=nms_iou)
-
-                # print(f"[DEBUG] after NMS: {len(dets)}")
-
-            frame = self.draw_boxes(frame, dets)
             self.frameReady.emit(self.to_qpixmap(frame))
 
             time.sleep(0.03)
 
         cap.release()
         self.status.emit("YOLO camera stopped")
-
@@ -0,0 +1,272 @@
+# utils/yolo_tracker.py
+"""YOLO 검출 결과용 경량 multi-object tracker (SORT 방식, NumPy Kalman).
+
+nms 결과는 프레임마다 독립이라 박스가 깜빡이고, 한 프레임짜리 오검출에도
+MQTT/장애물 로직이 반응한다. SortTracker 는
+  - 트랙마다 등속 Kalman filter (state = [cx, cy, w, h, vx, vy, vw, vh])
+  - 예측 박스와 검출의 IoU 로 greedy 매칭 (같은 class 끼리)
+    IoU 로 못 잡은 쌍은 중심 거리(박스 크기 기준)로 한 번 더 매칭 (추론 간격이 길어 IoU 가 0 이 되는 경우)
+  - min_hits 번 이상 확인되고 마지막 추론에서 매칭된 트랙만 출력 (SORT 의 time_since_update == 0)
+  - 매칭이 끊긴 트랙은 출력하지 않고 max_age_s 동안만 ID 를 기억해 두었다가 삭제
+로 안정적인 ID 와 부드러운 박스를 만든다. 사라진 물체가 등속 예측으로 빈 곳을 떠다니지 않는다.
+
+추론하지 않는 프레임에서는 predict(now) 로 (마지막 추론에서 매칭된) 트랙을 시간만큼 앞으로 밀어서 내보내므로,
+yolo_infer_stride / yolo_infer_max_hz 로 추론 빈도를 낮춰도 박스가 영상을 따라간다.
+
+Kalman 예측/보정은 (T, 8) / (T, 8, 8) 배열 단위로 한 번에 처리한다 (트랙별 파이썬 루프 없음).
+scipy 가 의존성에 없으므로 Hungarian 대신 greedy 매칭을 쓴다 (트랙 수가 적어 차이가 거의 없음).
+출력: (M, 7) float32 [x1, y1, x2, y2, score, cls, track_id]  (앞 6열은 기존 (N,6) 규약과 동일)
+"""
+import time
+
+import numpy as np
+
+EMPTY_TRACKS = np.zeros((0, 7), dtype=np.float32)
+
+_DIM = 8   # state 차원, 측정은 앞 4개 [cx, cy, w, h]
+
+
+def xyxy_to_cxcywh(b):
+    out = np.empty((len(b), 4), dtype=np.float64)
+    out[:, 0] = (b[:, 0] + b[:, 2]) * 0.5
+    out[:, 1] = (b[:, 1] + b[:, 3]) * 0.5
+    out[:, 2] = b[:, 2] - b[:, 0]
+    out[:, 3] = b[:, 3] - b[:, 1]
+    return out
+
+
+def cxcywh_to_xyxy(z):
+    out = np.empty((len(z), 4), dtype=np.float32)
+    hw = np.maximum(z[:, 2], 0.0) * 0.5
+    hh = np.maximum(z[:, 3], 0.0) * 0.5
+    out[:, 0] = z[:, 0] - hw
+    out[:, 1] = z[:, 1] - hh
+    out[:, 2] = z[:, 0] + hw
+    out[:, 3] = z[:, 1] + hh
+    return out
+
+
+def iou_matrix(a, b):
+    """(A,4) x (B,4) xyxy -> (A,B) IoU"""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / np.maximum(area_a[:, None] + area_b[None, :] - inter, 1e-9)
+
+
+def greedy_match(score, min_score):
+    """score (T,D) 가 큰 쌍부터 1:1 매칭. 반환: (track_idx, det_idx) 배열"""
+    if score.size == 0:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    ti, di = np.nonzero(score >= min_score)
+    order = np.argsort(-score[ti, di], kind="stable")
+    used_t = np.zeros(score.shape[0], dtype=bool)
+    used_d = np.zeros(score.shape[1], dtype=bool)
+    mt, md = [], []
+    for k in order:
+        t, d = ti[k], di[k]
+        if used_t[t] or used_d[d]:
+            continue
+        used_t[t] = used_d[d] = True
+        mt.append(t)
+        md.append(d)
+    return np.asarray(mt, dtype=np.intp), np.asarray(md, dtype=np.intp)
+
+
+class SortTracker:
+    def __init__(self, iou_thres=0.3, max_age_s=1.0, min_hits=2, centroid_gate=1.0,
+                 pos_noise=1.0, vel_noise=10.0, meas_noise=4.0):
+        self.iou_thres = float(iou_thres)
+        self.max_age_s = float(max_age_s)
+        self.min_hits = int(min_hits)
+        self.centroid_gate = float(centroid_gate)   # 중심 거리 <= gate * 예측 박스 대각선 이면 매칭 허용
+
+        self.pos_noise = float(pos_noise)       # 위치 process noise (px / s)
+        self.vel_noise = float(vel_noise)       # 속도 process noise (px / s^2)
+        self.meas_noise = float(meas_noise)     # 측정 noise (px)
+
+        self.reset()
+
+    @classmethod
+    def from_cfg(cls, cfg):
+        return cls(
+            iou_thres=getattr(cfg, "yolo_track_iou", 0.3),
+            max_age_s=getattr(cfg, "yolo_track_max_age_s", 1.0),
+            min_hits=getattr(cfg, "yolo_track_min_hits", 2),
+            centroid_gate=getattr(cfg, "yolo_track_centroid_gate", 1.0),
+        )
+
+    def reset(self):
+        self.x = np.zeros((0, _DIM))               # state
+        self.P = np.zeros((0, _DIM, _DIM))         # covariance
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.cls = np.zeros(0, dtype=np.float32)
+        self.score = np.zeros(0, dtype=np.float32)
+        self.hits = np.zeros(0, dtype=np.int32)
+        self.last_update = np.zeros(0)             # 마지막 매칭 시각
+        self.fresh = np.zeros(0, dtype=bool)       # 마지막 update() 에서 매칭/생성됨
+        self._t = None                             # 상태가 맞춰져 있는 시각
+        self._next_id = 1
+
+    def __len__(self):
+        return len(self.ids)
+
+    # -------------------------
+    # Kalman
+    # -------------------------
+    def _advance(self, now):
+        """모든 트랙을 now 시각으로 예측 (x = F x, P = F P F^T + Q)"""
+        if self._t is None:
+            self._t = now
+            return
+        dt = now - self._t
+        self._t = now
+        if dt <= 0 or len(self.ids) == 0:
+            return
+        F = np.eye(_DIM)
+        F[:4, 4:] = np.eye(4) * dt
+        self.x = self.x @ F.T
+        self.P = F @ self.P @ F.T
+        q = np.empty(_DIM)
+        q[:4] = (self.pos_noise * dt) ** 2
+        q[4:] = (self.vel_noise * dt) ** 2
+        self.P[:, np.arange(_DIM), np.arange(_DIM)] += q
+        # 폭/높이가 음수로 발산하지 않게
+        np.maximum(self.x[:, 2:4], 1.0, out=self.x[:, 2:4])
+
+    def _correct(self, t_idx, z):
+        """선택된 트랙(t_idx)을 측정 z (K,4) 로 보정"""
+        x = self.x[t_idx]
+        P = self.P[t_idx]
+        R = np.eye(4) * self.meas_noise ** 2
+        S = P[:, :4, :4] + R                         # H P H^T + R
+        K = P[:, :, :4] @ np.linalg.inv(S)           # P H^T S^-1   (K,8,4)
+        y = z - x[:, :4]
+        self.x[t_idx] = x + np.einsum("kij,kj->ki", K, y)
+        self.P[t_idx] = P - K @ P[:, :4, :]          # (I - K H) P
+
+    def _spawn(self, dets, now):
+        n = len(dets)
+        if n == 0:
+            return
+        x = np.zeros((n, _DIM))
+        x[:, :4] = xyxy_to_cxcywh(dets[:, :4])
+        P = np.zeros((n, _DIM, _DIM))
+        P[:, np.arange(4), np.arange(4)] = self.meas_noise ** 2
+        P[:, np.arange(4, _DIM), np.arange(4, _DIM)] = 100.0 ** 2   # 초기 속도는 모름
+        self.x = np.concatenate([self.x, x])
+        self.P = np.concatenate([self.P, P])
+        self.ids = np.concatenate([self.ids, np.arange(self._next_id, self._next_id + n)])
+        self._next_id += n
+        self.cls = np.concatenate([self.cls, dets[:, 5].astype(np.float32)])
+        self.score = np.concatenate([self.score, dets[:, 4].astype(np.float32)])
+        self.hits = np.concatenate([self.hits, np.ones(n, dtype=np.int32)])
+        self.last_update = np.concatenate([self.last_update, np.full(n, now)])
+        self.fresh = np.concatenate([self.fresh, np.ones(n, dtype=bool)])
+
+    def _prune(self, now):
+        keep = (now - self.last_update) <= self.max_age_s
+        if keep.all():
+            return
+        self.x, self.P = self.x[keep], self.P[keep]
+        self.ids, self.cls, self.score = self.ids[keep], self.cls[keep], self.score[keep]
+        self.hits, self.last_update = self.hits[keep], self.last_update[keep]
+        self.fresh = self.fresh[keep]
+
+    # -------------------------
+    # association
+    # -------------------------
+    def _associate(self, dets):
+        boxes = cxcywh_to_xyxy(self.x[:, :4])
+        same_cls = self.cls[:, None] == dets[None, :, 5]
+
+        iou = iou_matrix(boxes, dets[:, :4]) * same_cls
+        mt, md = greedy_match(iou, self.iou_thres)
+
+        # 2차: 남은 쌍을 중심 거리로 (정규화 거리가 작을수록 좋으므로 1 - d 를 score 로)
+        if self.centroid_gate > 0:
+            free_t = np.setdiff1d(np.arange(len(self.ids)), mt)
+            free_d = np.setdiff1d(np.arange(len(dets)), md)
+            if len(free_t) and len(free_d):
+                c_det = xyxy_to_cxcywh(dets[free_d, :4])[:, :2]
+                c_trk = self.x[free_t, :2]
+                radius = np.hypot(self.x[free_t, 2], self.x[free_t, 3])
+                d = np.linalg.norm(c_trk[:, None, :] - c_det[None, :, :], axis=2)
+                d /= np.maximum(radius[:, None] * self.centroid_gate, 1e-6)
+                score = (1.0 - d) * same_cls[np.ix_(free_t, free_d)]
+                ct, cd = greedy_match(score, 1e-6)
+                mt = np.concatenate([mt, free_t[ct]])
+                md = np.concatenate([md, free_d[cd]])
+        return mt, md
+
+    # -------------------------
+    # public
+    # -------------------------
+    def update(self, dets, now=None):
+        """추론 결과 (N,6) 로 트랙 갱신 -> 확인된 트랙 (M,7)"""
+        now = time.monotonic() if now is None else now
+        dets = np.asarray(dets, dtype=np.float32).reshape(-1, 6)
+
+        self._advance(now)
+        if len(self.ids) and len(dets):
+            mt, md = self._associate(dets)
+        else:
+            mt = md = np.zeros(0, dtype=np.intp)
+
+        self.fresh[:] = False
+        if len(mt):
+            self.fresh[mt] = True
+            self._correct(mt, xyxy_to_cxcywh(dets[md, :4]))
+            self.score[mt] = dets[md, 4]
+            self.hits[mt] += 1
+            self.last_update[mt] = now
+
+        unmatched = np.ones(len(dets), dtype=bool)
+        unmatched[md] = False
+        self._spawn(dets[unmatched], now)
+        self._prune(now)
+        return self.tracks()
+
+    def predict(self, now=None):
+        """추론 없는 프레임: 트랙만 now 로 예측 -> 확인된 트랙 (M,7)"""
+        now = time.monotonic() if now is None else now
+        self._advance(now)
+        self._prune(now)
+        return self.tracks()
+
+    def hold(self, now=None):
+        """장면이 정지한 동안 (motion gate): 마지막 추론에서 매칭된 트랙만 움직이지 않고 살려 둔다.
+
+        정지한 시간만큼 last_update 를 뒤로 미룬다 (now 로 덮지 않음).
+        매칭이 끊긴 트랙은 그대로 나이를 먹어서 max_age_s 가 지나면 삭제된다.
+        """
+        now = time.monotonic() if now is None else now
+        dt = now - self._t if self._t is not None else 0.0
+        self._t = now
+        if len(self.ids):
+            f = self.fresh
+            self.x[f, 4:] = 0.0
+            if dt > 0:
+                self.last_update[f] += dt
+            self._prune(now)
+
+    def has_tentative(self):
+        """마지막 추론에서 생겼거나 매칭됐지만 아직 min_hits 에 못 미친 트랙이 있는지 (확인하려면 다음 추론 필요)"""
+        return bool(np.any(self.fresh & (self.hits < self.min_hits)))
+
+    def tracks(self):
+        if len(self.ids) == 0:
+            return EMPTY_TRACKS
+        ok = (self.hits >= self.min_hits) & self.fresh
+        if not ok.any():
+            return EMPTY_TRACKS
+        out = np.empty((int(ok.sum()), 7), dtype=np.float32)
+        out[:, :4] = cxcywh_to_xyxy(self.x[ok, :4])
+        out[:, 4] = self.score[ok]
+        out[:, 5] = self.cls[ok]
+        out[:, 6] = self.ids[ok]
+        return out